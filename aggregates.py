@@ -0,0 +1,193 @@
+# aggregates.py
+# Aggregate cubes behind the analytics tab's Top 10, bubble and yearly
+# charts. For each dimension (Year, Genre, Director, Cast) a cube holds
+# per-key sums: movie count, rating sums and non-null counts (for means)
+# and box-office totals. A cube is the product of a sparse key-by-row
+# incidence matrix, taken from the inverted index for the list columns so
+# nothing is exploded, with the per-row measures; zeroing the measures of
+# rows outside a filter mask gives the cube of the filtered collection.
+# Kept free of Streamlit.
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from inverted_index import flatten
+from schema import KEY_COLUMN
+
+DIMENSIONS = ["Year", "Genre", "Director", "Cast"]
+INDEXED_DIMENSIONS = ["Genre", "Cast"]
+RATINGS = {"IMDB Rating": "imdb", "Rotten Tomatoes": "rt", "Metacritic Score": "mc"}
+MEASURES = ["titles"] + [f"{r}_{m}" for r in RATINGS.values() for m in ("sum", "n")] + ["box_sum"]
+
+
+def row_measures(df):
+    """Per-row contributions to every measure, as an (n_measures, n_rows) matrix."""
+    columns = [df["Title"].notna().to_numpy(dtype="float64")]
+    for col in RATINGS:
+        values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+        columns += [np.nan_to_num(values), ~np.isnan(values)]
+    columns.append(np.nan_to_num(df["Box Office"].to_numpy(dtype="float64", na_value=np.nan)))
+    return np.vstack(columns).astype("float64")
+
+
+def dimension_pairs(df, dimension, index=None):
+    """Return (keys, codes, rows): row ``rows[i]`` has key ``keys[codes[i]]``."""
+    if dimension in INDEXED_DIMENSIONS:
+        rows = index.row_positions(df) if index is not None else None
+        if rows is not None:
+            postings = index.fields[dimension]
+            rows = rows[postings.postings]
+            present = rows >= 0
+            return postings.values, postings.codes()[present], rows[present]
+        return flatten(df, dimension)
+    codes, keys = pd.factorize(df[dimension], sort=True)
+    rows = np.flatnonzero(codes >= 0)
+    keys = keys.to_numpy(dtype="int64") if dimension == "Year" else keys.to_numpy(dtype=object)
+    return keys, codes[rows], rows
+
+
+class Cube:
+    def __init__(self, keys, sums):
+        self.keys = keys
+        self.sums = sums  # (len(keys), len(MEASURES))
+
+    @classmethod
+    def from_pairs(cls, keys, codes, rows, measures, mask=None):
+        if len(codes) and (np.diff(codes) < 0).any():
+            order = np.argsort(codes, kind="stable")
+            codes, rows = codes[order], rows[order]
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(keys)))])
+        incidence = sp.csr_matrix(
+            (np.ones(len(rows)), rows, indptr), shape=(len(keys), measures.shape[1])
+        )
+        if mask is None:
+            present = np.diff(indptr) > 0
+        else:
+            measures = measures * mask
+            present = incidence @ mask.astype("float64") > 0
+        sums = np.asarray(incidence @ measures.T).reshape(len(keys), len(MEASURES))
+        return cls(np.asarray(keys)[present], sums[present])
+
+    def merged(self, other):
+        keys = np.union1d(self.keys, other.keys)
+        sums = np.zeros((len(keys), len(MEASURES)))
+        np.add.at(sums, np.searchsorted(keys, self.keys), self.sums)
+        np.add.at(sums, np.searchsorted(keys, other.keys), other.sums)
+        return Cube(keys, sums)
+
+    def table(self, dimension):
+        return pd.DataFrame(self.sums, columns=MEASURES, index=pd.Index(self.keys, name=dimension))
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.sums.nbytes
+
+
+def build_cubes(df, index=None, mask=None):
+    """Cubes of every dimension over df, optionally restricted to ``mask``."""
+    measures = row_measures(df)
+    return {
+        dim: Cube.from_pairs(*dimension_pairs(df, dim, index), measures, mask)
+        for dim in DIMENSIONS
+    }
+
+
+class CubeSet:
+    """Unfiltered cubes of the whole collection, persisted next to the backend."""
+
+    def __init__(self, cubes, ids):
+        self.cubes = cubes
+        self.ids = ids  # Movie IDs already counted
+
+    @classmethod
+    def build(cls, df, index=None):
+        return cls(build_cubes(df, index), df[KEY_COLUMN].to_numpy(dtype=object))
+
+    def contains_any(self, movie_ids):
+        return bool(np.isin(np.asarray(movie_ids, dtype=object), self.ids).any())
+
+    def add_rows(self, df):
+        """Return the cubes with the rows of newly added movies counted in."""
+        added = build_cubes(df)
+        cubes = {dim: self.cubes[dim].merged(added[dim]) for dim in DIMENSIONS}
+        return CubeSet(cubes, np.concatenate([self.ids, df[KEY_COLUMN].to_numpy(dtype=object)]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def needs_rebuild(self, op, rows):
+        # Sums cannot be taken back out: only movies not yet counted are folded in
+        return op == "delete" or (op == "upsert" and self.contains_any(rows[KEY_COLUMN]))
+
+    def apply(self, op, rows):
+        return self.add_rows(rows)
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + sum(c.nbytes for c in self.cubes.values())
+
+    def to_arrays(self):
+        arrays = {"ids": self.ids.astype(str)}
+        for dim, cube in self.cubes.items():
+            arrays[f"{dim}.keys"] = cube.keys.astype("int64" if dim == "Year" else str)
+            arrays[f"{dim}.sums"] = cube.sums
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        cubes = {}
+        for dim in DIMENSIONS:
+            keys = arrays[f"{dim}.keys"]
+            cubes[dim] = Cube(keys if dim == "Year" else keys.astype(object), arrays[f"{dim}.sums"])
+        return cls(cubes, arrays["ids"].astype(object))
+
+
+def cube_means(cube, dimension):
+    table = cube.table(dimension)
+    out = pd.DataFrame(index=table.index)
+    out["count"] = table["titles"].astype("int64")
+    for col, prefix in RATINGS.items():
+        n = table[f"{prefix}_n"]
+        out[col] = (table[f"{prefix}_sum"] / n).where(n > 0)
+    out["box"] = table["box_sum"]
+    return out
+
+
+def top10_summary(cube, group_by):
+    means = cube_means(cube, group_by)
+    return (
+        pd.DataFrame({
+            "Movie_Count": means["count"],
+            "Avg_IMDB": means["IMDB Rating"],
+            "Avg_RT": means["Rotten Tomatoes"],
+            "Avg_MC": means["Metacritic Score"],
+            "Total_Box": means["box"],
+        })
+        .dropna()
+        .sort_values("Movie_Count", ascending=False)
+        .head(10)
+        .round(2)
+    )
+
+
+def category_ratings(cube, category):
+    means = cube_means(cube, category)
+    return (
+        pd.DataFrame({
+            "avg_rt": means["Rotten Tomatoes"],
+            "avg_imdb": means["IMDB Rating"],
+            "avg_mc": means["Metacritic Score"],
+            "count": means["count"],
+        })
+        .dropna()
+        .reset_index()
+        .round(2)
+    )
+
+
+def yearly_counts(cube, rating_col):
+    means = cube_means(cube, "Year")
+    return (
+        pd.DataFrame({"count": means["count"], "avg_rating": means[rating_col]})
+        .dropna()
+        .reset_index()
+    )
@@ -1,7 +1,56 @@
 import streamlit as st
-import pandas as pd
 import altair as alt
-import ast
+import pandas as pd
+import perf
+from filter_engine import compile_mask
+from backend import load_index, load_cubes, load_similarity, load_title_index
+from memo import memoize_for
+from schema import KEY_COLUMN, normalize_title
+from aggregates import build_cubes, top10_summary, category_ratings, yearly_counts
+from chart_data import histogram, scatter_data
+
+def sampled_caption(points, total):
+    if len(points) < total:
+        st.caption(f"Showing a sample of {len(points):,} of {total:,} movies.")
+
+def pick_movie(df, title):
+    """Movie ID for a typed title: an exact title (with a Year choice for remakes), else a fuzzy match."""
+    titles = memoize_for(df, ("normalized_titles",), lambda: df["Title"].map(
+        lambda t: normalize_title(t) if isinstance(t, str) else ""
+    ))
+    matches = df.loc[titles == normalize_title(title), [KEY_COLUMN, "Title", "Year"]]
+    if len(matches) > 1:
+        labels = [f"{t} ({y})" if pd.notna(y) else t for t, y in zip(matches["Title"], matches["Year"])]
+        return matches[KEY_COLUMN].iloc[st.selectbox("Which one?", range(len(labels)), format_func=labels.__getitem__)]
+    if len(matches) == 1:
+        return matches[KEY_COLUMN].iloc[0]
+    match = load_title_index(df).resolve(title)
+    return match.movie_id if match and match.in_collection else None
+
+def similar_movies_panel(df):
+    st.subheader("🎞️ More Like This")
+    title = st.text_input("Movie", placeholder="Type a title from your collection")
+    if not title.strip():
+        return
+    movie_id = pick_movie(df, title)
+    if movie_id is None:
+        st.info(f"No movie titled {title!r} in the collection.")
+        return
+    with perf.span("similar movies") as span:
+        similarity = load_similarity(df)
+        ids, scores = similarity.similar(movie_id, k=10)
+        shared = similarity.shared(movie_id, ids)
+        rows = memoize_for(df, ("key_index",), lambda: pd.Index(df[KEY_COLUMN])).get_indexer(ids)
+        similar = df.iloc[rows[rows >= 0]][["Title", "Year", "Director"]].assign(
+            Similarity=scores[rows >= 0].round(3),
+            Shared=["; ".join(f"{field}: {', '.join(values[:3])}" for field, values in s.items())
+                    for s, row in zip(shared, rows) if row >= 0],
+        )
+        span.record(similar)
+    if similar.empty:
+        st.info("No movie in the collection shares cast, director or genre with this one.")
+        return
+    st.dataframe(similar.reset_index(drop=True), use_container_width=True)
 
 def analytics_tab(df):
     st.markdown(
@@ -17,30 +66,20 @@ def analytics_tab(df):
 
     st.header("🎬 Analytics Dashboard")
 
-    # Parse list-like fields
-    def parse_list_column(col):
-        return col.apply(
-            lambda x: [s.strip() for s in x.split(",")] if isinstance(x, str) and "," in x else
-            ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else
-            [] if pd.isna(x) else [x]
-        )
-
-    df["Genre"] = parse_list_column(df.get("Genre", pd.Series([])))
-    df["Cast"] = parse_list_column(df.get("Cast", pd.Series([])))
-
-    # Normalize numeric columns
-    for col in ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]:
-        df[col] = pd.to_numeric(df[col].astype(str).str.replace("%", "").str.strip(), errors="coerce")
-
-    for money_col in ["Box Office", "Budget"]:
-        df[money_col] = pd.to_numeric(df[money_col].astype(str).str.replace("[$,]", "", regex=True), errors="coerce")
-
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    # df is the normalized collection frame (see schema.normalize): list
+    # columns and numeric types are already in place, and it is shared with
+    # the other tabs, so it is never modified here.
+    if df.empty:
+        st.info("Add movies in the Data Management tab to see analytics.")
+        return
 
     # Unique filter values
-    all_genres = sorted({g for genres in df["Genre"] for g in genres if isinstance(g, str)})
-    all_cast = sorted({c for cast in df["Cast"] for c in cast if isinstance(c, str)})
-    all_directors = sorted(df["Director"].dropna().unique())
+    with perf.span("index") as span:
+        index = load_index(df)
+        span.record(rows=len(df), nbytes=index.nbytes)
+    all_genres = index.options("Genre")
+    all_cast = index.options("Cast")
+    all_directors = index.options("Director")
 
     # === Filters ===
     st.subheader("🔍 Filters")
@@ -64,124 +103,132 @@ def analytics_tab(df):
     top_100_only = st.checkbox("Top 100 Only")
 
     # Apply filtering logic
-    filtered_df = df.copy()
-    if top_100_only and "Rank" in df.columns:
-        filtered_df = filtered_df[filtered_df["Rank"].notna()]
-
-    def matches(row):
-        return (
-            year_range[0] <= row["Year"] <= year_range[1]
-            and budget_range[0] <= row["Budget"] <= budget_range[1]
-            and box_office_range[0] <= row["Box Office"] <= box_office_range[1]
-            and (not genre_filter or any(g in row["Genre"] for g in genre_filter))
-            and (not director_filter or row["Director"] in director_filter)
-            and (not actor_filter or any(a in row["Cast"] for a in actor_filter))
+    def filter_mask():
+        mask = compile_mask(
+            df, year_range, budget_range, box_office_range,
+            genre_filter, director_filter, actor_filter, index=index
         )
-
-    filtered_df = filtered_df[filtered_df.apply(matches, axis=1)].copy()
+        if top_100_only and "Rank" in df.columns:
+            mask &= df["Rank"].notna().to_numpy()
+        return mask
+
+    # Filtered frame and aggregates are memoized per data version and
+    # filter selection, so reruns that only change a chart option reuse them
+    filter_key = (
+        tuple(year_range), tuple(budget_range), tuple(box_office_range),
+        tuple(genre_filter), tuple(director_filter), tuple(actor_filter), top_100_only
+    )
+    with perf.span("filter mask") as span:
+        mask = memoize_for(df, ("mask",) + filter_key, filter_mask)
+        span.record(rows=int(mask.sum()), nbytes=mask.nbytes)
+    with perf.span("filtered frame") as span:
+        filtered_df = memoize_for(df, ("filtered",) + filter_key, lambda: df[mask])
+        span.record(filtered_df)
+
+    # Summary tables read the precomputed cubes; with filters active the
+    # cubes are recomputed over the masked rows, still without exploding
+    def filtered_cubes():
+        if mask.all():
+            return load_cubes(df).cubes
+        return build_cubes(df, index, mask)
+    with perf.span("aggregate cubes") as span:
+        cubes = memoize_for(df, ("cubes",) + filter_key, filtered_cubes)
+        span.record(nbytes=sum(cube.nbytes for cube in cubes.values()))
 
     # === Ratings Histogram ===
     rating_col = st.selectbox("Rating Type", ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"])
-    st.altair_chart(
-        alt.Chart(filtered_df.dropna(subset=[rating_col])).mark_bar().encode(
-            x=alt.X(rating_col, bin=True),
-            y="count()",
-            tooltip=[rating_col]
-        ).properties(height=300),
-        use_container_width=True
-    )
+    # Charts receive only the columns they encode, pre-binned or sampled
+    # (see chart_data), rather than the whole filtered frame
+    with perf.span("chart: ratings histogram") as span:
+        hist_df = memoize_for(df, ("hist", rating_col) + filter_key, lambda: histogram(filtered_df[rating_col]))
+        span.record(hist_df)
+        st.altair_chart(
+            alt.Chart(hist_df).mark_bar().encode(
+                x=alt.X("bin_start:Q", bin="binned", title=rating_col),
+                x2="bin_end:Q",
+                y=alt.Y("count:Q", title="Count of Records"),
+                tooltip=[alt.Tooltip("bin_start:Q", title="From"), alt.Tooltip("bin_end:Q", title="To"), "count:Q"]
+            ).properties(height=300),
+            use_container_width=True
+        )
 
     # === Ratings Scatter ===
-    st.altair_chart(
-        alt.Chart(filtered_df.dropna(subset=["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]))
-        .mark_circle()
-        .encode(
-            x="IMDB Rating",
-            y="Rotten Tomatoes",
-            size=alt.Size("Metacritic Score", scale=alt.Scale(range=[10, 400])),
-            color=alt.Color("Metacritic Score", scale=alt.Scale(scheme='purpleorange')),
-            tooltip=["Title", "Year", "Director", "IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]
+    with perf.span("chart: ratings scatter") as span:
+        ratings = ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]
+        scatter_df, scatter_total = memoize_for(df, ("ratings_scatter",) + filter_key, lambda: scatter_data(
+            filtered_df, ["Title", "Year", "Director"] + ratings, ratings
+        ))
+        span.record(scatter_df)
+        sampled_caption(scatter_df, scatter_total)
+        st.altair_chart(
+            alt.Chart(scatter_df)
+            .mark_circle()
+            .encode(
+                x="IMDB Rating",
+                y="Rotten Tomatoes",
+                size=alt.Size("Metacritic Score", scale=alt.Scale(range=[10, 400])),
+                color=alt.Color("Metacritic Score", scale=alt.Scale(scheme='purpleorange')),
+                tooltip=["Title", "Year", "Director", "IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]
+            )
+            .properties(height=400),
+            use_container_width=True
         )
-        .properties(height=400),
-        use_container_width=True
-    )
 
     # === Top 10 Summary Table ===
     st.subheader("🏆 Top 10 Summary")
     group_by = st.selectbox("Top 10 by", ["Year", "Genre", "Director", "Cast"])
-    exploded = filtered_df.explode(group_by) if group_by in ["Genre", "Cast"] else filtered_df
-
-    top_10 = (
-        exploded.groupby(group_by)
-        .agg(
-            Movie_Count=("Title", "count"),
-            Avg_IMDB=("IMDB Rating", "mean"),
-            Avg_RT=("Rotten Tomatoes", "mean"),
-            Avg_MC=("Metacritic Score", "mean"),
-            Total_Box=("Box Office", "sum")
-        )
-        .dropna()
-        .sort_values("Movie_Count", ascending=False)
-        .head(10)
-        .round(2)
-    )
-    top_10["Total_Box"] = top_10["Total_Box"].apply(lambda x: f"${x:,.0f}")
-    st.dataframe(top_10)
+    with perf.span("top 10 table") as span:
+        top_10 = memoize_for(df, ("top10", group_by) + filter_key, lambda: top10_summary(cubes[group_by], group_by))
+        top_10 = top_10.assign(Total_Box=top_10["Total_Box"].apply(lambda x: f"${x:,.0f}"))
+        span.record(top_10)
+        st.dataframe(top_10)
 
     # === Ratings by Category Bubble Chart ===
     st.subheader("📈 Ratings by Category")
     bubble_cat = st.selectbox("Bubble Category", ["Director", "Genre", "Year", "Cast"], index=0)
-    exploded_cat = filtered_df.explode(bubble_cat) if bubble_cat in ["Genre", "Cast"] else filtered_df
-
-    bubble_df = (
-        exploded_cat.groupby(bubble_cat)
-        .agg(
-            avg_rt=("Rotten Tomatoes", "mean"),
-            avg_imdb=("IMDB Rating", "mean"),
-            avg_mc=("Metacritic Score", "mean"),
-            count=("Title", "count")
+    with perf.span("chart: ratings by category") as span:
+        bubble_df = memoize_for(df, ("bubble", bubble_cat) + filter_key, lambda: category_ratings(cubes[bubble_cat], bubble_cat))
+        span.record(bubble_df)
+        st.altair_chart(
+            alt.Chart(bubble_df).mark_circle().encode(
+                x="avg_imdb",
+                y="avg_rt",
+                size="count",
+                color=alt.Color("avg_mc", scale=alt.Scale(range=["#f27802", "#2e0854", "#7786c8", "#708090", "#b02711"])),
+                tooltip=[bubble_cat, "avg_rt", "avg_imdb", "avg_mc", "count"]
+            ).properties(height=400),
+            use_container_width=True
         )
-        .dropna()
-        .reset_index()
-        .round(2)
-    )
-
-    st.altair_chart(
-        alt.Chart(bubble_df).mark_circle().encode(
-            x="avg_imdb",
-            y="avg_rt",
-            size="count",
-            color=alt.Color("avg_mc", scale=alt.Scale(range=["#f27802", "#2e0854", "#7786c8", "#708090", "#b02711"])),
-            tooltip=[bubble_cat, "avg_rt", "avg_imdb", "avg_mc", "count"]
-        ).properties(height=400),
-        use_container_width=True
-    )
 
     # === Budget vs. Box Office ===
     st.subheader("💰 Budget vs Box Office")
-    bo_df = filtered_df.dropna(subset=["Box Office", "Budget"])
-    st.altair_chart(
-        alt.Chart(bo_df).mark_circle().encode(
-            x=alt.X("Budget", scale=alt.Scale(zero=False)),
-            y=alt.Y("Box Office", scale=alt.Scale(zero=False)),
-            size="Rotten Tomatoes",
-            color=alt.Color("IMDB Rating", scale=alt.Scale(range=["#f27802", "#2e0854", "#7786c8", "#708090", "#b02711"])),
-            tooltip=["Title", "Year", "Budget", "Box Office"]
-        ).properties(height=400),
-        use_container_width=True
-    )
+    with perf.span("chart: budget vs box office") as span:
+        bo_df, bo_total = memoize_for(df, ("budget_scatter",) + filter_key, lambda: scatter_data(
+            filtered_df, ["Title", "Year", "Budget", "Box Office", "Rotten Tomatoes", "IMDB Rating"],
+            ["Box Office", "Budget"]
+        ))
+        span.record(bo_df)
+        sampled_caption(bo_df, bo_total)
+        st.altair_chart(
+            alt.Chart(bo_df).mark_circle().encode(
+                x=alt.X("Budget", scale=alt.Scale(zero=False)),
+                y=alt.Y("Box Office", scale=alt.Scale(zero=False)),
+                size="Rotten Tomatoes",
+                color=alt.Color("IMDB Rating", scale=alt.Scale(range=["#f27802", "#2e0854", "#7786c8", "#708090", "#b02711"])),
+                tooltip=["Title", "Year", "Budget", "Box Office"]
+            ).properties(height=400),
+            use_container_width=True
+        )
 
     # === Dual Axis Chart: Movies per Year vs Rating ===
     st.subheader("📊 Movies Per Year vs Avg Rating")
     rating_axis = st.selectbox("Rating Axis", ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"])
-    yearly = (
-        filtered_df.groupby("Year")
-        .agg(count=("Title", "count"), avg_rating=(rating_axis, "mean"))
-        .dropna()
-        .reset_index()
-    )
-
-    base = alt.Chart(yearly).encode(x="Year:O")
-    bar = base.mark_bar().encode(y="count")
-    line = base.mark_line(color="#b02711").encode(y=alt.Y("avg_rating", axis=alt.Axis(title="Avg Rating")))
-    st.altair_chart((bar + line).resolve_scale(y="independent").properties(height=400), use_container_width=True)
+    with perf.span("chart: movies per year") as span:
+        yearly = memoize_for(df, ("yearly", rating_axis) + filter_key, lambda: yearly_counts(cubes["Year"], rating_axis))
+        span.record(yearly)
+        base = alt.Chart(yearly).encode(x="Year:O")
+        bar = base.mark_bar().encode(y="count")
+        line = base.mark_line(color="#b02711").encode(y=alt.Y("avg_rating", axis=alt.Axis(title="Avg Rating")))
+        st.altair_chart((bar + line).resolve_scale(y="independent").properties(height=400), use_container_width=True)
+
+    similar_movies_panel(df)
@@ -1,9 +1,13 @@
 # app.py
 import streamlit as st
-import pandas as pd
-import os
-from datetime import datetime
-from tmdb_api import fetch_movie_data
+from tmdb_api import OFFLINE_MODE
+from backend import load_data, clear_data, inflation_base_year, set_inflation_base_year
+import inflation
+from importer import check_columns
+from jobs import submit_titles, submit_csv
+from import_panel import jobs_panel
+from perf_panel import perf_panel, perf_session, tracing
+import perf
 from analytics_tab import analytics_tab
 from top_100_tab import top_100_tab
 # from data_management_tab import data_management_tab
@@ -41,75 +45,74 @@ st.markdown("""
 st.markdown('<div class="title">MovieGraph</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle"><span>B</span><span>Y </span><span>C</span><span>H</span><span>U</span><span>C</span><span>K</span></div>', unsafe_allow_html=True)
 
-BACKEND_PATH = "data/backend_movie_data.csv"
-REQUIRED_COLUMNS = [
-    "Title", "Rank", "Year", "Genre", "Director", "Cast",
-    "IMDB Rating", "Rotten Tomatoes", "Metacritic Score", "Awards",
-    "Runtime", "Language", "Overview",
-    "Box Office", "Box Office (Adj)", "Budget", "Budget (Adj)", "Date Added"
-]
-
-def load_data():
-    if os.path.exists(BACKEND_PATH):
-        return pd.read_csv(BACKEND_PATH)
-    return pd.DataFrame(columns=REQUIRED_COLUMNS)
-
-def save_data(df):
-    os.makedirs(os.path.dirname(BACKEND_PATH), exist_ok=True)
-    df.to_csv(BACKEND_PATH, index=False)
+def inflation_panel():
+    table = inflation.load_table()
+    with st.expander("Inflation adjustment"):
+        if table is None:
+            st.caption(f"No CPI table at {inflation.CPI_PATH}; adjusted money columns are left as stored.")
+            return
+        st.caption(f"CPI table {table.version}, {table.first_year}-{table.last_year}.")
+        base_year = st.number_input(
+            "Express adjusted money in dollars of year", min_value=table.first_year, max_value=table.last_year,
+            value=int(inflation_base_year(table)), step=1
+        )
+        if st.button("Recompute adjusted columns"):
+            # Recomputed from stored amounts; nothing is re-fetched
+            set_inflation_base_year(int(base_year))
+            st.success(f"Box Office (Adj) and Budget (Adj) are now in {int(base_year)} dollars.")
 
 def data_management_tab():
     st.subheader("Add Movies to Your Collection")
     title_input = st.text_area("Enter movie titles (one per line):")
+    offline = st.checkbox("Offline mode (use cached lookups only)", value=OFFLINE_MODE)
     if st.button("Add Movies"):
         if title_input.strip():
             movie_titles = [title.strip() for title in title_input.strip().split("\n") if title.strip()]
-            existing_df = load_data()
-            with st.spinner("Fetching movie data..."):
-                progress_bar = st.progress(0)
-                new_movies, skipped, not_found = [], [], []
-                for i, title in enumerate(movie_titles):
-                    if title in existing_df["Title"].values:
-                        skipped.append(title)
-                        continue
-                    data = fetch_movie_data(title)
-                    if data:
-                        new_movies.append(data)
-                    else:
-                        not_found.append(title)
-                    progress_bar.progress((i + 1) / len(movie_titles))
-            if new_movies:
-                df_new = pd.DataFrame(new_movies)
-                df_new["Date Added"] = datetime.now().strftime("%Y-%m-%d")
-                updated_df = pd.concat([existing_df, df_new], ignore_index=True)
-                save_data(updated_df)
-                st.success(f"Added {len(new_movies)} movies. Skipped: {len(skipped)}. Not found: {len(not_found)}")
-                if skipped:
-                    st.warning(f"Skipped: {', '.join(skipped)}")
-                if not_found:
-                    st.error(f"Not found: {', '.join(not_found)}")
-            else:
-                st.info("No new movies were added.")
+            # Runs in the background; titles already in the collection (or
+            # typed twice) are caught locally and batches commit as they finish
+            submit_titles(movie_titles, offline=offline)
+
+    uploaded_file = st.file_uploader(
+        "Or import a CSV with a 'Title' column (or a final_movie_data.csv export)", type="csv", key="bulk_import"
+    )
+    if uploaded_file and st.button("Import CSV"):
+        data = uploaded_file.getvalue()
+        error = check_columns(data)
+        if error:
+            st.error(error)
+        else:
+            submit_csv(data, uploaded_file.name, offline=offline)
+
+    jobs_panel(["titles", "csv"])
 
     if st.button("Clear All Data"):
-        if os.path.exists(BACKEND_PATH):
-            os.remove(BACKEND_PATH)
-            st.success("All movie data cleared.")
+        clear_data()
+        st.success("All movie data cleared.")
+
+    inflation_panel()
 
-    df = load_data()
+    with perf.span("load data") as span:
+        df = load_data()
+        span.record(df)
     st.subheader("Your Movie Collection")
     st.write(f"Total Movies: {len(df)}")
-    st.dataframe(df.sort_values("Date Added", ascending=False), use_container_width=True)
+    with perf.span("collection table") as span:
+        span.record(df)
+        st.dataframe(df.sort_values("Date Added", ascending=False), use_container_width=True)
     return df
 
-tabs = st.tabs(["Data Management", "Analytics", "Top 100"])
+# Timing spans are recorded only while this session's performance panel is on
+with perf.rerun(traced=tracing(), session=perf_session()):
+    tabs = st.tabs(["Data Management", "Analytics", "Top 100"])
+
+    with tabs[0], perf.span("Data Management tab"):
+        df = data_management_tab()
 
-with tabs[0]:
-    df = data_management_tab()
+    with tabs[1], perf.span("Analytics tab"):
+        analytics_tab(df)
 
-with tabs[1]:
-    analytics_tab(df)
+    with tabs[2], perf.span("Top 100 tab"):
+        top_100_tab()
 
-with tabs[2]:
-    top_100_tab()
+perf_panel()
 
@@ -1,14 +1,212 @@
-import pandas as pd
+import json
 import os
+import threading
+from storage import atomic_write, get_store, load_arrays, migrate_csv, save_arrays
+from inverted_index import InvertedIndex
+from memo import cache
+from title_index import TitleIndex, read_reference
+from rankings import RankHistory
+import inflation
+import perf
 
-BACKEND_PATH = "data/backend_movie_data.csv"
+DATA_DIR = "data"
+LEGACY_CSV_PATH = os.path.join(DATA_DIR, "backend_movie_data.csv")
+BACKEND_FORMAT = os.environ.get("MOVIEGRAPH_BACKEND")  # "log", "parquet" or "csv"
+
+store = get_store(os.path.join(DATA_DIR, "backend_movie_data"), BACKEND_FORMAT)
+BACKEND_PATH = store.path
+INDEX_PATH = os.path.join(DATA_DIR, "backend_movie_data.index.npz")
+CUBES_PATH = os.path.join(DATA_DIR, "backend_movie_data.cubes.npz")
+SIMILAR_PATH = os.path.join(DATA_DIR, "backend_movie_data.similar.npz")
+rank_history = RankHistory(os.path.join(DATA_DIR, "rank_history"))
+# CPI table version and base year the stored adjusted columns were computed with
+INFLATION_PATH = os.path.join(DATA_DIR, "backend_movie_data.inflation.json")
+_inflation_lock = threading.Lock()
+# Reference export whose typed titles and ids seed local title resolution
+REFERENCE_CSV_PATH = os.environ.get("MOVIEGRAPH_REFERENCE_CSV", "final_movie_data.csv")
+
+def data_version():
+    return store.version()
 
 def load_data():
-    if os.path.exists(BACKEND_PATH):
-        return pd.read_csv(BACKEND_PATH)
-    else:
-        return pd.DataFrame()
+    """Return the collection, re-reading storage only when it has changed.
+
+    The frame is shared across reruns and must not be modified in place.
+    """
+    migrate_csv(LEGACY_CSV_PATH, store)
+    sync_inflation()
+    version = data_version()
+    return cache.get(("data", version), lambda: _load_versioned(version))
+
+def _load_versioned(version):
+    with perf.span("storage load") as span:
+        df = store.load()
+        span.record(df)
+    # Lets derived results be memoized against the data they came from
+    df.attrs["data_version"] = version
+    return df
+
+def inflation_settings():
+    try:
+        with open(INFLATION_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def write_inflation_settings(settings):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(settings, f, indent=1)
+    atomic_write(INFLATION_PATH, write)
+
+def inflation_base_year(table):
+    # The chosen base year, else the latest year of the CPI table
+    return inflation_settings().get("base_year") or table.last_year
+
+def with_inflation(df):
+    """Return df with its adjusted money columns computed from the current CPI table."""
+    table = inflation.load_table()
+    if table is None:
+        return df
+    return inflation.adjust(df, table, inflation_base_year(table))
+
+def sync_inflation():
+    """Recompute the stored adjusted columns if the CPI table or base year has changed.
+
+    Runs entirely on stored data: the whole collection is adjusted in one
+    pass and rewritten under the store lock (so commits made meanwhile are
+    kept), with no lookups.
+    """
+    table = inflation.load_table()
+    if table is None:
+        return False
+    with _inflation_lock:
+        settings = inflation_settings()
+        base_year = settings.get("base_year") or table.last_year
+        applied = {"cpi_version": table.version, "base_year": base_year}
+        if settings.get("applied") == applied:
+            return False
+        if store.exists():
+            with perf.span("inflation recompute") as span:
+                def adjust(df):
+                    span.record(rows=len(df))
+                    return inflation.adjust(df, table, base_year)
+                store.rewrite(adjust)
+            cache.invalidate()
+        write_inflation_settings({**settings, "applied": applied})
+        return True
+
+def set_inflation_base_year(base_year):
+    """Express adjusted money in ``base_year`` dollars (None for the CPI table's latest year)."""
+    with _inflation_lock:
+        write_inflation_settings({**inflation_settings(), "base_year": base_year})
+    return sync_inflation()
 
 def save_data(df):
-    os.makedirs("data", exist_ok=True)
-    df.to_csv(BACKEND_PATH, index=False)
+    store.save(with_inflation(df))
+    cache.invalidate()
+
+def append_movies(df):
+    store.append(with_inflation(df))
+    cache.invalidate()
+
+def upsert_movies(df):
+    store.upsert_by_key(with_inflation(df))
+    cache.invalidate()
+
+def delete_movies_where(predicate):
+    deleted = store.delete_where(predicate)
+    cache.invalidate()
+    return deleted
+
+def clear_data():
+    store.clear()
+    cache.invalidate()
+
+def record_rankings(source):
+    """Snapshot the current Top 100 into the rank history (skipped if unchanged)."""
+    return rank_history.record(load_data(), source)
+
+def frame_version(df):
+    version = df.attrs.get("data_version") if df is not None else None
+    return data_version() if version is None else version
+
+def _sync_derived(name, path, kind, version, df, build):
+    """Return the ``kind`` structure saved at ``path``, brought up to ``version``.
+
+    The storage changes made since it was saved are replayed through its
+    ``needs_rebuild(op, rows)`` and ``apply(op, rows)`` hooks. It is rebuilt
+    with ``build(df)`` when those changes are no longer available, one of
+    them cannot be applied, or the result does not hold exactly the stored
+    movies (say, after a clear).
+    """
+    with perf.span(f"{name} sync") as span:
+        arrays, saved_version = load_arrays(path)
+        derived = kind.from_arrays(arrays) if arrays is not None else None
+        if derived is not None and saved_version == version:
+            span.record(rows=len(derived), nbytes=derived.nbytes)
+            return derived
+        changes = store.changes_since(saved_version) if derived is not None else None
+        for op, rows in changes or []:
+            if derived.needs_rebuild(op, rows):
+                changes = None
+                break
+            derived = derived.apply(op, rows)
+        df = df if df is not None else load_data()
+        if changes is None or len(derived) != len(df):
+            derived = build(df)
+        save_arrays(path, version, derived.to_arrays())
+        span.record(rows=len(derived), nbytes=derived.nbytes)
+        return derived
+
+def load_index(df=None):
+    """Return the inverted index for the stored collection.
+
+    The saved index catches up by replaying the storage changes made since
+    it was written; it is only rebuilt from ``df`` (or a fresh load) when
+    those changes are no longer available.
+    """
+    version = frame_version(df)
+    return cache.get(
+        ("index", version),
+        lambda: _sync_derived("index", INDEX_PATH, InvertedIndex, version, df, InvertedIndex.build)
+    )
+
+def load_cubes(df=None):
+    """Return the unfiltered aggregate cubes for the stored collection.
+
+    Newly added movies are folded into the saved cubes; any other change
+    (an edit or delete of a counted movie) rebuilds them from the frame and
+    the inverted index, which needs no explode.
+    """
+    # Imported here so headless imports (cli.py) do not load scipy
+    from aggregates import CubeSet
+    version = frame_version(df)
+    return cache.get(
+        ("cubes", version),
+        lambda: _sync_derived("cubes", CUBES_PATH, CubeSet, version, df, lambda df: CubeSet.build(df, load_index(df)))
+    )
+
+def load_similarity(df=None):
+    """Return the "more like this" SimilarityIndex for the stored collection.
+
+    Like the cubes, added movies are folded into the saved index (their
+    neighbors computed, existing neighbor lists updated), and upserts that
+    leave cast, director and genres alone (rank edits) keep it; other
+    edits, deletes, or enough additions to shift the IDF weights rebuild it.
+    """
+    # Imported here so headless imports (cli.py) do not load scipy
+    from similarity import SimilarityIndex
+    version = frame_version(df)
+    return cache.get(
+        ("similar", version),
+        lambda: _sync_derived("similarity", SIMILAR_PATH, SimilarityIndex, version, df, SimilarityIndex.build)
+    )
+
+def load_title_index(df=None):
+    """Return the TitleIndex over the stored collection and the reference export."""
+    version = frame_version(df)
+    return cache.get(
+        ("titles", version),
+        lambda: TitleIndex.build(df if df is not None else load_data(), read_reference(REFERENCE_CSV_PATH))
+    )
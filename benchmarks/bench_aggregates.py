@@ -0,0 +1,121 @@
+# benchmarks/bench_aggregates.py
+# Checks the aggregate cubes against the explode + groupby tables the
+# analytics tab used to build, on the bundled final_movie_data.csv, then
+# times both at 10k and 100k rows (unfiltered and with a filter mask).
+#
+#   python benchmarks/bench_aggregates.py
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aggregates import DIMENSIONS, build_cubes, top10_summary, category_ratings  # noqa: E402
+from filter_engine import compile_mask  # noqa: E402
+from inverted_index import InvertedIndex  # noqa: E402
+from schema import from_legacy  # noqa: E402
+
+SIZES = [10_000, 100_000]
+
+
+def exploded_top10(df, group_by):
+    # The Top 10 table previously built by analytics_tab
+    exploded = df.explode(group_by) if group_by in ["Genre", "Cast"] else df
+    return (
+        exploded.groupby(group_by)
+        .agg(
+            Movie_Count=("Title", "count"),
+            Avg_IMDB=("IMDB Rating", "mean"),
+            Avg_RT=("Rotten Tomatoes", "mean"),
+            Avg_MC=("Metacritic Score", "mean"),
+            Total_Box=("Box Office", "sum")
+        )
+        .dropna()
+        .sort_values("Movie_Count", ascending=False)
+        .head(10)
+        .round(2)
+    )
+
+
+def exploded_bubble(df, category):
+    exploded = df.explode(category) if category in ["Genre", "Cast"] else df
+    return (
+        exploded.groupby(category)
+        .agg(
+            avg_rt=("Rotten Tomatoes", "mean"),
+            avg_imdb=("IMDB Rating", "mean"),
+            avg_mc=("Metacritic Score", "mean"),
+            count=("Title", "count")
+        )
+        .dropna()
+        .reset_index()
+        .round(2)
+    )
+
+
+def split_table(table):
+    # (key column as strings, measures as floats); key dtypes differ between
+    # the two implementations (e.g. Int64 vs int64 years)
+    if not isinstance(table.index, pd.RangeIndex):
+        table = table.reset_index()
+    return table.iloc[:, 0].astype(str).tolist(), table.iloc[:, 1:].to_numpy(dtype="float64")
+
+
+def same_table(expected, actual):
+    expected_keys, expected_values = split_table(expected)
+    actual_keys, actual_values = split_table(actual)
+    return (
+        expected_keys == actual_keys
+        and expected_values.shape == actual_values.shape
+        # Sums are accumulated in a different order, so a mean sitting on a
+        # .xx5 boundary may round either way
+        and np.allclose(expected_values, actual_values, rtol=0, atol=0.0101, equal_nan=True)
+    )
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    base = from_legacy(pd.read_csv(os.path.join(ROOT, "final_movie_data.csv")))
+    # The legacy export has no Rotten Tomatoes scores; derive some so the
+    # rating means are exercised
+    base["Rotten Tomatoes"] = (base["IMDB Rating"] * 10).round()
+    index = InvertedIndex.build(base)
+    mask = compile_mask(base, year_range=(1990, 2010), genres=["Drama"], index=index)
+
+    print(f"Equivalence on final_movie_data.csv ({len(base)} rows)")
+    for label, m in (("all rows", None), ("filtered", mask)):
+        cubes = build_cubes(base, index, m)
+        subset = base if m is None else base[m]
+        for dim in DIMENSIONS:
+            ok = (same_table(exploded_top10(subset, dim), top10_summary(cubes[dim], dim))
+                  and same_table(exploded_bubble(subset, dim), category_ratings(cubes[dim], dim)))
+            print(f"  {label:<9} {dim:<9} {'ok' if ok else 'MISMATCH'}")
+
+    print()
+    print(f"{'rows':>8} {'case':<10} {'explode':>10} {'cubes':>10} {'speedup':>8}")
+    for size in SIZES:
+        df = base.sample(size, replace=True, random_state=0).reset_index(drop=True)
+        df["Movie ID"] = [f"bench:{i}" for i in range(size)]
+        index = InvertedIndex.build(df)
+        mask = compile_mask(df, year_range=(1990, 2010), index=index)
+        for label, m in (("all rows", None), ("filtered", mask)):
+            subset = df if m is None else df[m]
+            old = timed(lambda: [exploded_top10(subset, d) for d in DIMENSIONS], repeat=1)
+            new = timed(lambda: [top10_summary(c, d) for d, c in build_cubes(df, index, m).items()])
+            print(f"{size:>8} {label:<10} {old * 1000:>8.0f}ms {new * 1000:>8.0f}ms {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_calls.py
+# API calls per imported title against the stub server
+# (tools/stub_server.py), for the old four-call sequence and the current
+# call plan. Titles are the first 100 title_input values of
+# final_movie_data.csv.
+#
+#   python benchmarks/bench_calls.py
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import stub_server  # noqa: E402
+
+server = stub_server.serve(0)
+PORT = server.server_address[1]
+os.environ["TMDB_BASE_URL"] = f"http://127.0.0.1:{PORT}/3"
+os.environ["OMDB_BASE_URL"] = f"http://127.0.0.1:{PORT}/omdb/"
+
+import tmdb_api  # noqa: E402
+from http_scheduler import RequestStats, track  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from title_index import TitleIndex, read_reference  # noqa: E402
+
+SAMPLE = 100
+
+
+def old_plan(title, movie_id=None):
+    # The sequence fetch_movie_data used to make: search, detail, credits,
+    # then OMDb by title
+    url = tmdb_api.TMDB_BASE_URL
+    key = {"api_key": tmdb_api.api_keys()[0]}
+    results = tmdb_api.get_json("tmdb_search", f"{url}/search/movie", {**key, "query": title})["results"]
+    tmdb_id = results[0]["id"]
+    detail = tmdb_api.get_json("tmdb_movie", f"{url}/movie/{tmdb_id}", key)
+    tmdb_api.get_json("tmdb_credits", f"{url}/movie/{tmdb_id}/credits", key)
+    tmdb_api.get_json("omdb", tmdb_api.OMDB_BASE_URL, {"t": title, "y": detail["release_date"][:4]})
+
+
+def new_plan(title, movie_id=None):
+    tmdb_api.fetch_movie_data(title, movie_id=movie_id)
+
+
+def run(plan, titles, ids):
+    calls = []
+    for title, movie_id in zip(titles, ids):
+        with track(RequestStats()) as stats:
+            plan(title, movie_id)
+            calls.append(stats.calls)
+    return sum(calls) / len(calls), max(calls)
+
+
+def main():
+    reference = read_reference(os.path.join(ROOT, "final_movie_data.csv"))
+    titles = reference["title_input"].dropna().tolist()[:SAMPLE]
+    index = TitleIndex.build(None, reference)
+    resolved = [m.movie_id if m else None for m in map(index.resolve, titles)]
+    unresolved = [None] * len(titles)
+
+    print(f"{len(titles)} titles, {sum(r is not None for r in resolved)} resolved by the title index")
+    print(f"{'plan':<36} {'calls/title':>11} {'max':>4}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cases = [
+            ("old: search, detail, credits, OMDb", old_plan, unresolved, True),
+            ("new: title not in the index", new_plan, unresolved, True),
+            ("new: title resolved locally", new_plan, resolved, True),
+            ("new: re-import, responses cached", new_plan, resolved, False),
+        ]
+        for i, (label, plan, ids, fresh_cache) in enumerate(cases):
+            if fresh_cache:
+                tmdb_api.response_cache = ResponseCache(os.path.join(cache_dir, f"{i}.sqlite"))
+            mean, worst = run(plan, titles, ids)
+            print(f"{label:<36} {mean:>11.2f} {worst:>4}")
+
+
+if __name__ == "__main__":
+    main()
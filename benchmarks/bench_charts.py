@@ -0,0 +1,79 @@
+# benchmarks/bench_charts.py
+# Size of the Vega-Lite spec sent to the browser for the analytics tab's
+# histogram and two scatters, and the time to build it, when the charts
+# get the whole filtered frame (as before) versus the reduced inputs from
+# chart_data. Altair's 5000-row limit is lifted for the old charts so
+# they can be measured at all.
+#
+#   python benchmarks/bench_charts.py
+import os
+import sys
+import time
+
+import altair as alt
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from chart_data import histogram, scatter_data  # noqa: E402
+from synthetic import generate_collection  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+RATINGS = ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]
+
+
+def old_charts(df):
+    return [
+        alt.Chart(df.dropna(subset=["IMDB Rating"])).mark_bar().encode(
+            x=alt.X("IMDB Rating", bin=True), y="count()", tooltip=["IMDB Rating"]
+        ),
+        alt.Chart(df.dropna(subset=RATINGS)).mark_circle().encode(
+            x="IMDB Rating", y="Rotten Tomatoes", size="Metacritic Score",
+            tooltip=["Title", "Year", "Director"] + RATINGS
+        ),
+        alt.Chart(df.dropna(subset=["Box Office", "Budget"])).mark_circle().encode(
+            x="Budget", y="Box Office", size="Rotten Tomatoes", color="IMDB Rating",
+            tooltip=["Title", "Year", "Budget", "Box Office"]
+        ),
+    ]
+
+
+def new_charts(df):
+    ratings, _ = scatter_data(df, ["Title", "Year", "Director"] + RATINGS, RATINGS)
+    budget, _ = scatter_data(df, ["Title", "Year", "Budget", "Box Office", "Rotten Tomatoes", "IMDB Rating"],
+                             ["Box Office", "Budget"])
+    return [
+        alt.Chart(histogram(df["IMDB Rating"])).mark_bar().encode(
+            x=alt.X("bin_start:Q", bin="binned"), x2="bin_end:Q", y="count:Q"
+        ),
+        alt.Chart(ratings).mark_circle().encode(
+            x="IMDB Rating", y="Rotten Tomatoes", size="Metacritic Score",
+            tooltip=["Title", "Year", "Director"] + RATINGS
+        ),
+        alt.Chart(budget).mark_circle().encode(
+            x="Budget", y="Box Office", size="Rotten Tomatoes", color="IMDB Rating",
+            tooltip=["Title", "Year", "Budget", "Box Office"]
+        ),
+    ]
+
+
+def spec_size(build, df):
+    start = time.perf_counter()
+    size = sum(len(chart.to_json()) for chart in build(df))
+    return size, time.perf_counter() - start
+
+
+def main():
+    alt.data_transformers.disable_max_rows()
+    print(f"{'rows':>8} {'old spec':>10} {'old time':>9} {'new spec':>10} {'new time':>9}")
+    for n in SIZES:
+        df = generate_collection(n)
+        old_bytes, old_time = spec_size(old_charts, df)
+        new_bytes, new_time = spec_size(new_charts, df)
+        print(f"{n:>8,} {old_bytes / 2**20:>8.1f}MB {old_time * 1000:>7.0f}ms "
+              f"{new_bytes / 2**20:>8.2f}MB {new_time * 1000:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
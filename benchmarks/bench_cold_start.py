@@ -0,0 +1,48 @@
+# benchmarks/bench_cold_start.py
+# Cold-start cost of the headless entry points against the app's imports.
+# Each case runs in a fresh interpreter (best of --repeat), from the repo
+# root, so nothing is shared through sys.modules:
+#
+#   app imports   streamlit plus the modules app.py imports
+#   importer      what cli.py loads before its first fetch
+#   cli --help    argument parsing only
+#
+#   python benchmarks/bench_cold_start.py [--repeat 5]
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("app imports", ["-c", "import streamlit, backend, importer, jobs, analytics_tab, top_100_tab, perf_panel"]),
+    ("importer", ["-c", "import importer, sys; assert 'streamlit' not in sys.modules, 'streamlit imported'"]),
+    ("cli --help", ["cli.py", "--help"]),
+]
+
+
+def cold_start(args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best is kept")
+    args = parser.parse_args()
+
+    baseline = None
+    for name, case in CASES:
+        seconds = cold_start(case, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<12} {seconds * 1000:>8.0f} ms {seconds / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
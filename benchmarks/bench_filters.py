@@ -0,0 +1,87 @@
+# benchmarks/bench_filters.py
+# Compares the vectorized filter engine with the old row-wise
+# DataFrame.apply filter: checks both agree on the bundled
+# final_movie_data.csv, then times them on 10k and 100k row collections.
+#
+#   python benchmarks/bench_filters.py
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from filter_engine import compile_mask  # noqa: E402
+from inverted_index import InvertedIndex  # noqa: E402
+from schema import from_legacy  # noqa: E402
+
+SIZES = [10_000, 100_000]
+
+
+def rowwise_mask(df, year_range, budget_range, box_office_range, genres, directors, actors):
+    # The filter previously used by filters.py and analytics_tab.py
+    def matches(row):
+        return (
+            year_range[0] <= row["Year"] <= year_range[1]
+            and budget_range[0] <= row["Budget"] <= budget_range[1]
+            and box_office_range[0] <= row["Box Office"] <= box_office_range[1]
+            and (not genres or any(g in row["Genre"] for g in genres))
+            and (not directors or row["Director"] in directors)
+            and (not actors or any(a in row["Cast"] for a in actors))
+        )
+    return df.apply(matches, axis=1).to_numpy(dtype=bool)
+
+
+def filter_cases(df):
+    year = (df["Year"].min(), df["Year"].max())
+    budget = (df["Budget"].min(), df["Budget"].max())
+    box = (df["Box Office"].min(), df["Box Office"].max())
+    return {
+        "no filters": (year, budget, box, [], [], []),
+        "year range": ((1990, 2005), budget, box, [], [], []),
+        "budget + box office": (year, (1e7, 1e8), (5e7, 1e9), [], [], []),
+        "genres": (year, budget, box, ["Drama", "Horror"], [], []),
+        "director": (year, budget, box, [], ["Steven Spielberg", "Christopher Nolan"], []),
+        "actor": (year, budget, box, [], [], ["Tom Hanks"]),
+        "combined": ((1980, 2020), budget, box, ["Drama"], [], ["Tom Hanks", "Meryl Streep"]),
+    }
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    base = from_legacy(pd.read_csv(os.path.join(ROOT, "final_movie_data.csv")))
+
+    print(f"Equivalence on final_movie_data.csv ({len(base)} rows)")
+    for name, args in filter_cases(base).items():
+        expected = rowwise_mask(base, *args)
+        actual = compile_mask(base, *args)
+        status = "ok" if np.array_equal(expected, actual) else "MISMATCH"
+        print(f"  {name:<22} {int(actual.sum()):>5} rows  {status}")
+
+    print()
+    print(f"{'rows':>8} {'case':<22} {'row-wise':>10} {'engine':>10} {'speedup':>8}")
+    for size in SIZES:
+        df = base.sample(size, replace=True, random_state=0).reset_index(drop=True)
+        # Resampled rows need distinct keys for the index to tell them apart
+        df["Movie ID"] = [f"bench:{i}" for i in range(size)]
+        index = InvertedIndex.build(df)
+        for name in ("no filters", "combined"):
+            args = filter_cases(df)[name]
+            old = timed(lambda: rowwise_mask(df, *args), repeat=1)
+            new = timed(lambda: compile_mask(df, *args, index=index))
+            print(f"{size:>8} {name:<22} {old * 1000:>8.1f}ms {new * 1000:>8.2f}ms {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
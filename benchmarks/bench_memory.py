@@ -0,0 +1,82 @@
+# benchmarks/bench_memory.py
+# Memory report for the collection frame: per-column footprint of a 100k
+# title synthetic collection loaded from the Parquet store, in the old
+# layout (Python lists of Python strings, string Director and Language)
+# and the compact one (coded lists and categoricals, see compact.py).
+# Sizes count every Python object a column keeps alive, strings inside
+# lists included, and the Arrow buffers behind coded columns.
+#
+#   python benchmarks/bench_memory.py [rows]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from schema import CATEGORY_COLUMNS, LIST_COLUMNS  # noqa: E402
+from storage import get_store  # noqa: E402
+from synthetic import generate_collection  # noqa: E402
+
+ROWS = 100_000
+
+
+def old_load(path):
+    # The loader before the compact layout: Parquet lists became numpy
+    # arrays and then Python lists, and Director and Language were plain
+    # string columns
+    df = pq.read_table(path).to_pandas(ignore_metadata=True)
+    for col in LIST_COLUMNS:
+        df[col] = df[col].map(lambda v: [] if v is None else [str(x) for x in v])
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("str")
+    return df
+
+
+def column_bytes(series):
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return series.array.nbytes
+    if series.dtype != object:
+        return int(series.memory_usage(index=False, deep=True))
+    seen = set()
+    total = series.to_numpy().nbytes
+    for value in series:
+        for obj in (value, *value) if isinstance(value, list) else (value,):
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    with tempfile.TemporaryDirectory() as tmp:
+        store = get_store(os.path.join(tmp, "movies"), "parquet")
+        store.save(generate_collection(rows))
+        start = time.perf_counter()
+        old = old_load(store.path)
+        old_time = time.perf_counter() - start
+        start = time.perf_counter()
+        new = store.load()
+        new_time = time.perf_counter() - start
+
+    print(f"{rows:,} titles, {sum(len(c) for c in new['Cast']):,} cast credits")
+    print(f"{'column':<18} {'old MB':>9} {'new MB':>9} {'ratio':>7}   new dtype")
+    totals = np.zeros(2)
+    for col in new.columns:
+        sizes = np.array([column_bytes(old[col]), column_bytes(new[col])]) / 2**20
+        totals += sizes
+        dtype = "coded list" if isinstance(new[col].dtype, pd.ArrowDtype) else str(new[col].dtype)
+        print(f"{col:<18} {sizes[0]:>9.1f} {sizes[1]:>9.1f} {sizes[0] / max(sizes[1], 1e-9):>6.1f}x   {dtype}")
+    print(f"{'total':<18} {totals[0]:>9.1f} {totals[1]:>9.1f} {totals[0] / totals[1]:>6.1f}x")
+    print(f"load time: old {old_time * 1000:.0f} ms, new {new_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_parse.py
+# Parse cost per Streamlit rerun before and after the parse-once schema
+# layer, measured on the bundled final_movie_data.csv.
+#
+# Before: every rerun read the backend CSV and re-parsed Genre/Cast and the
+# rating/money columns in both analytics_tab and filters.apply_filters.
+# After: the frame is normalized once when stored, loading the typed store
+# does no string parsing, and reruns do none at all.
+#
+#   python benchmarks/bench_parse.py
+import ast
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from schema import from_legacy, normalize  # noqa: E402
+from storage import get_store, parquet_available  # noqa: E402
+
+RERUNS = 10
+
+
+def legacy_backend_csv(df):
+    # The backend CSV as the old fetch code wrote it: comma-joined lists and
+    # ratings/money as text.
+    old = df.copy()
+    for col in ("Genre", "Cast"):
+        old[col] = old[col].map(", ".join)
+    old["Rotten Tomatoes"] = old["IMDB Rating"].map(lambda v: "" if pd.isna(v) else f"{int(v * 10)}%")
+    old["Budget"] = old["Budget"].map(lambda v: "" if pd.isna(v) else f"${v:,.0f}")
+    return old.to_csv(index=False)
+
+
+def old_rerun(csv_text):
+    df = pd.read_csv(io.StringIO(csv_text))
+
+    # analytics_tab
+    def parse_analytics(col):
+        return col.apply(
+            lambda x: [s.strip() for s in x.split(",")] if isinstance(x, str) and "," in x else
+            ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else
+            [] if pd.isna(x) else [x]
+        )
+    df["Genre"] = parse_analytics(df["Genre"])
+    df["Cast"] = parse_analytics(df["Cast"])
+    for col in ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace("%", "").str.strip(), errors="coerce")
+    for col in ["Box Office", "Budget"]:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace("[$,]", "", regex=True), errors="coerce")
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+
+    # filters.apply_filters on a fresh load
+    df2 = pd.read_csv(io.StringIO(csv_text))
+    for col in ("Genre", "Cast"):
+        df2[col] = df2[col].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else [])
+    for col in ["Budget", "Box Office"]:
+        df2[col] = pd.to_numeric(df2[col].astype(str).str.replace("[$,]", "", regex=True), errors="coerce")
+    return df
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    base = from_legacy(pd.read_csv(os.path.join(ROOT, "final_movie_data.csv")))
+    csv_text = legacy_backend_csv(base)
+    print(f"final_movie_data.csv: {len(base)} rows, {len(csv_text) / 1e6:.1f} MB as backend CSV")
+
+    old_total = sum(timed(lambda: old_rerun(csv_text))[0] for _ in range(RERUNS))
+
+    once, normalized = timed(lambda: normalize(pd.read_csv(io.StringIO(csv_text))))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = get_store(os.path.join(tmp, "movies"))
+        store.save(normalized)
+        load_total = sum(timed(store.load)[0] for _ in range(RERUNS))
+        renormalize = timed(lambda: normalize(normalized))[0]
+
+    backend = "log-structured Parquet" if parquet_available() else "CSV"
+    print(f"{'old: load + re-parse per rerun':<40} {old_total / RERUNS * 1000:>8.1f} ms/rerun")
+    print(f"{'new: one-time parse at ingest':<40} {once * 1000:>8.1f} ms once")
+    print(f"{'new: typed load (' + backend + ')':<40} {load_total / RERUNS * 1000:>8.1f} ms/load")
+    print(f"{'new: normalize() on a normalized frame':<40} {renormalize * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
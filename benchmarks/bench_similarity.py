@@ -0,0 +1,68 @@
+# benchmarks/bench_similarity.py
+# "More like this" on synthetic collections: index build, query latency
+# for movies whose neighbor list is not yet filled (a sparse row times the
+# feature-by-movie transpose) and for filled ones, and folding in newly
+# added movies. Sampled neighbor lists are checked against a brute-force
+# cosine over the whole collection.
+#
+#   python benchmarks/bench_similarity.py [rows ...]
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from similarity import NEIGHBORS, SimilarityIndex  # noqa: E402
+from synthetic import generate_collection  # noqa: E402
+
+SIZES = [10_000, 100_000]
+ADDED = 100
+QUERIES = 50
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def exact(index, position):
+    # Brute force: cosine against every movie, the movie itself excluded
+    scores = (index.matrix[position] @ index.matrix.T).toarray().ravel()
+    scores[position] = 0
+    best = np.sort(scores)[::-1][:NEIGHBORS]
+    return best[best > 0]
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or SIZES
+    for size in sizes:
+        df = generate_collection(size)
+        ids = df["Movie ID"].to_numpy(dtype=object)
+        index, build = timed(lambda: SimilarityIndex.build(df.iloc[:-ADDED]))
+        index.transpose()
+        rng = np.random.default_rng(0)
+        sample = rng.choice(size - ADDED, QUERIES, replace=False)
+        cold, warm = [], []
+        for position in sample:
+            cold.append(timed(lambda: index.similar(ids[position]))[1])
+            warm.append(timed(lambda: index.similar(ids[position]))[1])
+        added, add_time = timed(lambda: index.add_rows(df.iloc[-ADDED:]))
+        checked = list(sample[:10]) + list(range(size - ADDED, size, 10))
+        mismatches = sum(
+            not np.allclose(added.scores[p][added.neighbors[p] >= 0], exact(added, p), atol=1e-5) for p in checked
+        )
+        print(f"{size:,} titles ({'all lists filled at build' if index.computed.all() else 'lists filled on query'})")
+        print(f"  build           {build * 1000:>9.1f} ms   {index.nbytes / 2**20:.1f} MB")
+        print(f"  query, unfilled {np.median(cold) * 1000:>9.2f} ms median, {max(cold) * 1000:.2f} ms max")
+        print(f"  query, filled   {np.median(warm) * 1000:>9.2f} ms median")
+        print(f"  add {ADDED} titles  {add_time * 1000:>9.1f} ms")
+        print(f"  exact neighbors {len(checked) - mismatches}/{len(checked)}")
+
+
+if __name__ == "__main__":
+    main()
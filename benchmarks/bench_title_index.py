@@ -0,0 +1,77 @@
+# benchmarks/bench_title_index.py
+# Requests made to add titles with and without local title resolution,
+# against the stub server (tools/stub_server.py). The titles are the
+# title_input column of the bundled final_movie_data.csv, mixed with
+# case/punctuation variants, typos and repeats.
+#
+#   python benchmarks/bench_title_index.py
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import stub_server  # noqa: E402
+
+server = stub_server.serve(0, latency=0.01)
+PORT = server.server_address[1]
+os.environ["TMDB_BASE_URL"] = f"http://127.0.0.1:{PORT}/3"
+os.environ["OMDB_BASE_URL"] = f"http://127.0.0.1:{PORT}/omdb/"
+
+import tmdb_api  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+from title_index import TitleIndex, read_reference  # noqa: E402
+
+SAMPLE = 200
+
+
+def workload(reference):
+    typed = reference["title_input"].dropna().tolist()[:SAMPLE]
+    variants = [t.upper() + "!" for t in typed[:20]]
+    typos = [t[:-1] for t in typed[20:40] if len(t) > 8]
+    return typed + variants + typos + typed[:20]
+
+
+def run(titles, index, cache_dir):
+    # A fresh, empty response cache per run
+    tmdb_api.response_cache = ResponseCache(os.path.join(cache_dir, f"{id(index)}.sqlite"))
+    stub_server.StubHandler.request_count = 0
+    start = time.perf_counter()
+    ids, seen, queued = [], set(), []
+    for title in titles:
+        match = index.resolve(title) if index is not None else None
+        if match and match.movie_id in seen:
+            continue
+        if match:
+            seen.add(match.movie_id)
+        queued.append(title)
+        ids.append(match.movie_id if match else None)
+    tmdb_api.fetch_movies_batch(queued, movie_ids=ids)
+    return time.perf_counter() - start, stub_server.StubHandler.request_count, len(queued)
+
+
+def main():
+    reference = read_reference(os.path.join(ROOT, "final_movie_data.csv"))
+    start = time.perf_counter()
+    index = TitleIndex.build(None, reference)
+    build = time.perf_counter() - start
+    titles = workload(reference)
+
+    start = time.perf_counter()
+    resolved = sum(index.resolve(t) is not None for t in titles)
+    lookup = (time.perf_counter() - start) / len(titles)
+    print(f"index: {len(index)} titles, built in {build * 1000:.1f} ms, "
+          f"{lookup * 1e6:.0f} us/lookup, {resolved}/{len(titles)} resolved")
+
+    print(f"{'':<22} {'fetched':>8} {'requests':>9} {'time':>8}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, idx in (("search every title", None), ("local resolution", index)):
+            elapsed, requests, fetched = run(titles, idx, cache_dir)
+            print(f"{label:<22} {fetched:>8} {requests:>9} {elapsed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
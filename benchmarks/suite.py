@@ -0,0 +1,172 @@
+# benchmarks/suite.py
+# Headless benchmark suite over synthetic collections (benchmarks/synthetic.py).
+# For each size it times the save, load, CSV parse, upsert, index build,
+# filter, aggregate and ranking-save stages against a store in a temporary
+# directory, then reruns each stage under tracemalloc for its peak memory.
+# Results are written as JSON, keyed by commit, so runs can be compared:
+#
+#   python benchmarks/suite.py --sizes 1k,10k,100k
+#   python benchmarks/suite.py --compare benchmarks/results/<commit>.json
+#
+# No Streamlit server or network is needed; the modules behind the tabs
+# are called directly.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aggregates import build_cubes, top10_summary  # noqa: E402
+from filter_engine import compile_mask  # noqa: E402
+from inverted_index import InvertedIndex  # noqa: E402
+from rankings import rank_changes  # noqa: E402
+from storage import CsvStore, get_store  # noqa: E402
+from synthetic import generate_collection  # noqa: E402
+
+DEFAULT_SIZES = "1k,10k,100k,1M"
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+UPSERT_ROWS = 100
+
+
+def parse_size(text):
+    text = text.strip()
+    scale = {"k": 1_000, "M": 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def commit_sha():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def stages(df, workdir):
+    """Return (name, fn) pairs; each fn runs one stage from a clean state."""
+    store = get_store(os.path.join(workdir, "movies"))
+    csv_store = CsvStore(os.path.join(workdir, "movies.csv"))
+    csv_store.save(df)
+
+    rng = np.random.default_rng(1)
+    updates = df.iloc[rng.choice(len(df), min(UPSERT_ROWS, len(df)), replace=False)].copy()
+    updates["IMDB Rating"] = 5.0
+    year = (1980, 2020)
+    budget = (df["Budget"].min(), df["Budget"].max())
+    box = (df["Box Office"].min(), df["Box Office"].max())
+    actors = df["Cast"].iloc[0][:2]
+    index = InvertedIndex.build(df)
+    ranked = df[df["Rank"].notna()].sort_values("Rank")[["Rank", "Title", "Movie ID"]]
+    edited = ranked.assign(Rank=ranked["Rank"].to_numpy()[::-1])
+
+    def upsert():
+        store.save(df)
+        store.upsert_by_key(updates)
+        store.load()
+
+    def aggregate():
+        mask = compile_mask(df, year_range=year, genres=["Drama"], index=index)
+        for cubes in (build_cubes(df, index), build_cubes(df, index, mask)):
+            top10_summary(cubes["Director"], "Director")
+
+    return [
+        ("save", lambda: store.save(df)),
+        ("load", store.load),
+        ("parse csv", csv_store.load),
+        (f"upsert {UPSERT_ROWS}", upsert),
+        ("index build", lambda: InvertedIndex.build(df)),
+        ("filter", lambda: compile_mask(df, year, budget, box, ["Drama"], [], actors, index=index)),
+        ("aggregate", aggregate),
+        ("rank save", lambda: rank_changes(df, edited)),
+    ]
+
+
+def measure(fn, repeat, memory):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        # A separate run, as tracing slows allocation-heavy code down
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes, repeat=3, memory=True):
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        df = generate_collection(size)
+        print(f"\n{size:,} rows (generated in {time.perf_counter() - start:.1f}s)")
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, fn in stages(df, workdir):
+                seconds, peak = measure(fn, repeat, memory)
+                results.append({"size": size, "stage": name, "seconds": seconds, "peak_mb": peak})
+                peak_text = f"{peak:>9.1f}" if peak is not None else f"{'-':>9}"
+                print(f"  {name:<12} {seconds * 1000:>10.1f} ms {peak_text} MB")
+    return results
+
+
+def compare(results, previous):
+    before = {(r["size"], r["stage"]): r for r in previous["results"]}
+    print(f"\nCompared with {previous['commit']} ({previous['timestamp']}):")
+    print(f"  {'size':>9} {'stage':<12} {'time':>8} {'peak':>8}")
+    for r in results:
+        old = before.get((r["size"], r["stage"]))
+        if old is None:
+            continue
+        time_ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("nan")
+        peak_ratio = r["peak_mb"] / old["peak_mb"] if r["peak_mb"] and old["peak_mb"] else float("nan")
+        print(f"  {r['size']:>9,} {r['stage']:<12} {time_ratio:>7.2f}x {peak_ratio:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated, e.g. 1k,10k,100k,1M")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage; the best is kept")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    parser.add_argument("--output", help="results JSON (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    sha = commit_sha()
+    results = run([parse_size(s) for s in args.sizes.split(",")], args.repeat, not args.no_memory)
+    report = {
+        "commit": sha,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{sha}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nWrote {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/synthetic.py
+# Synthetic movie collections in the canonical schema (schema.normalize),
+# for benchmarks at sizes the bundled CSV cannot reach. Directors and cast
+# are drawn from skewed pools, as in real collections a few names appear
+# in many movies and most in only a few; cast lists are long (15-40 names)
+# to stress the list columns.
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from schema import REQUIRED_COLUMNS, normalize  # noqa: E402
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama",
+    "Family", "Fantasy", "History", "Horror", "Music", "Mystery", "Romance",
+    "Science Fiction", "TV Movie", "Thriller", "War", "Western",
+]
+LANGUAGES = ["EN", "FR", "ES", "DE", "JA", "KO", "IT", "HI", "ZH", "SV"]
+
+
+def skewed_choice(rng, pool_size, size, skew=2.5):
+    # Indexes 0..pool_size-1, power-law heavy towards 0: the first 1% of the
+    # pool takes about 16% of the draws
+    return (pool_size * rng.random(size) ** skew).astype(np.int64)
+
+
+def split_lists(values, lengths):
+    bounds = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+    values = values.tolist()
+    return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def generate_collection(n, seed=0, ranked=100):
+    """Return a normalized collection frame with ``n`` synthetic movies."""
+    rng = np.random.default_rng(seed)
+    actors = np.array([f"Actor {i}" for i in range(max(50, n // 2))], dtype=object)
+    directors = np.array([f"Director {i}" for i in range(max(10, n // 5))], dtype=object)
+
+    cast_lengths = rng.integers(15, 41, n)
+    cast = split_lists(actors[skewed_choice(rng, len(actors), int(cast_lengths.sum()))], cast_lengths)
+    genre_lengths = rng.integers(1, 5, n)
+    genres = split_lists(np.array(GENRES, dtype=object)[rng.integers(0, len(GENRES), int(genre_lengths.sum()))],
+                         genre_lengths)
+
+    year = rng.integers(1930, 2026, n)
+    budget = np.round(rng.lognormal(16.5, 1.2, n), -3)
+    box_office = np.round(budget * rng.lognormal(0.5, 1.0, n), -3)
+    inflation = 1 + 0.03 * (2024 - year)
+    imdb = np.clip(rng.normal(6.5, 1.0, n), 1, 10).round(1)
+    rank = np.full(n, np.nan)
+    rank[rng.choice(n, min(ranked, n), replace=False)] = np.arange(1, min(ranked, n) + 1)
+
+    def with_missing(values, fraction):
+        values = values.astype("float64")
+        values[rng.random(n) < fraction] = np.nan
+        return values
+
+    df = pd.DataFrame({
+        "Title": [f"Synthetic Movie {i}" for i in range(n)],
+        "Rank": rank,
+        "Year": pd.array(year, dtype="Int64"),
+        "Genre": genres,
+        "Director": directors[skewed_choice(rng, len(directors), n)],
+        "Cast": cast,
+        "IMDB Rating": with_missing(imdb, 0.02),
+        "Rotten Tomatoes": with_missing(np.clip(imdb * 10 + rng.normal(0, 12, n), 0, 100).round(), 0.15),
+        "Metacritic Score": with_missing(np.clip(imdb * 10 + rng.normal(0, 10, n), 0, 100).round(), 0.2),
+        "Awards": np.where(rng.random(n) < 0.1, "1 Oscar nomination", ""),
+        "Runtime": [f"{m} min" for m in rng.integers(70, 200, n)],
+        "Language": np.array(LANGUAGES, dtype=object)[skewed_choice(rng, len(LANGUAGES), n)],
+        "Overview": [f"Overview of synthetic movie {i}." for i in range(n)],
+        "Box Office": with_missing(box_office, 0.05),
+        "Box Office (Adj)": with_missing(np.round(box_office * inflation), 0.05),
+        "Budget": with_missing(budget, 0.05),
+        "Budget (Adj)": with_missing(np.round(budget * inflation), 0.05),
+        "Date Added": pd.to_datetime("2020-01-01") + pd.to_timedelta(rng.integers(0, 2000, n), unit="D"),
+        "Movie ID": [f"tt{9000000 + i:07d}" for i in range(n)],
+    })
+    df["Date Added"] = df["Date Added"].dt.strftime("%Y-%m-%d")
+    return normalize(df[REQUIRED_COLUMNS])
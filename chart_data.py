@@ -0,0 +1,73 @@
+# chart_data.py
+# Reduces chart inputs before they reach Altair, which embeds every row
+# and column of the frame it is given in the page. Charts get only the
+# columns they encode or show in tooltips, histograms arrive pre-binned,
+# and scatters above MAX_POINTS are sampled. Sampling keeps the movies
+# whose hashed id is smallest, so a movie's point stays put across
+# reruns and filter changes.
+import math
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from schema import KEY_COLUMN
+
+# Scatter points sent to the browser; Altair refuses frames over 5000 rows
+MAX_POINTS = int(os.environ.get("MOVIEGRAPH_CHART_POINTS", 5000))
+MAX_BINS = 10
+
+
+def project(df, columns, required=()):
+    """Return only ``columns`` of df, without rows missing a ``required`` value."""
+    columns = list(dict.fromkeys(columns))
+    out = df[columns]
+    if required:
+        out = out.dropna(subset=list(required))
+    return out
+
+
+def sample(df, limit=MAX_POINTS):
+    """Return at most ``limit`` rows of df (which must hold KEY_COLUMN), chosen by hashed id."""
+    if len(df) <= limit:
+        return df
+    hashes = hash_pandas_object(df[KEY_COLUMN], index=False).to_numpy()
+    keep = np.sort(np.argpartition(hashes, limit - 1)[:limit])
+    return df.iloc[keep]
+
+
+def scatter_data(df, columns, required, limit=MAX_POINTS):
+    """Projected, sampled scatter input and the number of rows it stands for."""
+    points = project(df, [KEY_COLUMN] + list(columns), required)
+    total = len(points)
+    points = sample(points, limit)
+    if KEY_COLUMN not in columns:
+        points = points.drop(columns=KEY_COLUMN)
+    return points, total
+
+
+def bin_step(span, max_bins=MAX_BINS):
+    # A 1, 2 or 5 times power-of-ten step giving at most max_bins bins, as
+    # Vega-Lite's bin=True chooses
+    if span <= 0:
+        return 1.0
+    step = 10 ** math.floor(math.log10(span / max_bins))
+    for factor in (1, 2, 5, 10):
+        if span / (step * factor) <= max_bins:
+            return step * factor
+    return step * 10
+
+
+def histogram(values, max_bins=MAX_BINS):
+    """Counts of ``values`` in nice bins, as a frame of bin_start, bin_end, count."""
+    values = pd.to_numeric(values, errors="coerce").dropna().to_numpy(dtype="float64")
+    if not len(values):
+        return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+    step = bin_step(values.max() - values.min(), max_bins)
+    start = math.floor(values.min() / step) * step
+    codes = np.floor((values - start) / step).astype(np.int64)
+    counts = np.bincount(codes)
+    edges = start + step * np.arange(len(counts))
+    present = counts > 0
+    return pd.DataFrame({"bin_start": edges[present], "bin_end": edges[present] + step, "count": counts[present]})
@@ -0,0 +1,106 @@
+# cli.py
+# Headless batch enrichment: imports a title list or CSV into the backend
+# without Streamlit, for cron jobs and workers. Runs from the app directory
+# (it uses the same data/ backend and response cache as the app) and
+# resumes an interrupted import from its checkpoint like the app does.
+#
+#   python cli.py titles.txt                  # one title per line ("-" reads stdin)
+#   python cli.py watchlist.csv --workers 16  # a CSV with a Title column, or a legacy export
+#   python cli.py top100.csv --ranked         # replace the Top 100
+#
+# API keys come from TMDB_API_KEY / OMDB_API_KEY, else .streamlit/secrets.toml.
+# Heavy modules are imported only once the arguments are parsed, so --help
+# and argument errors return immediately.
+import argparse
+import os
+import sys
+import time
+
+STATUSES = [("added", "added"), ("skipped", "skipped"), ("not_found", "not found"), ("failed", "failed")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Enrich a title list or CSV into the MovieGraph backend.")
+    parser.add_argument("source", help="text file with one title per line, a .csv file, or - for stdin")
+    parser.add_argument("--csv", action="store_true", help="read the source as CSV whatever its name")
+    parser.add_argument("--ranked", action="store_true", help="CSV with Rank and Title: replace the Top 100")
+    parser.add_argument("--offline", action="store_true", help="use cached lookups only")
+    parser.add_argument("--workers", type=int, help="titles fetched in parallel (default MOVIEGRAPH_MAX_CONCURRENCY or 8)")
+    parser.add_argument("--tmdb-rate", type=float, help="TMDB requests per second")
+    parser.add_argument("--omdb-rate", type=float, help="OMDb requests per second")
+    parser.add_argument("--batch-size", type=int, help="titles committed per batch")
+    parser.add_argument("--restart", action="store_true", help="import again even if this source already finished")
+    parser.add_argument("--quiet", action="store_true", help="print only the summary")
+    return parser.parse_args(argv)
+
+
+def configure(args):
+    # Read by tmdb_api and http_scheduler at import, so set before importing them
+    if args.workers:
+        os.environ["MOVIEGRAPH_MAX_CONCURRENCY"] = str(args.workers)
+    if args.tmdb_rate:
+        os.environ["MOVIEGRAPH_TMDB_RATE"] = str(args.tmdb_rate)
+    if args.omdb_rate:
+        os.environ["MOVIEGRAPH_OMDB_RATE"] = str(args.omdb_rate)
+
+
+def read_source(path):
+    if path == "-":
+        return sys.stdin.buffer.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def progress_line(checkpoint, elapsed):
+    counts = "  ".join(f"{label} {checkpoint.counts[status]}" for status, label in STATUSES)
+    total = checkpoint.total_rows or 0
+    return (f"[{checkpoint.progress():>4.0%}] {checkpoint.rows_done}/{total} rows  {counts}  "
+            f"calls {checkpoint.calls}  {elapsed:.0f}s")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure(args)
+    if args.ranked and not (args.csv or args.source.lower().endswith(".csv")):
+        sys.exit("--ranked needs a CSV source")
+    try:
+        data = read_source(args.source)
+    except OSError as e:
+        sys.exit(f"cannot read {args.source}: {e.strerror}")
+
+    import importer
+
+    start = time.perf_counter()
+    show = sys.stderr.isatty() and not args.quiet
+
+    def on_progress(checkpoint):
+        line = progress_line(checkpoint, time.perf_counter() - start)
+        if show:
+            print(f"\r{line}", end="", file=sys.stderr, flush=True)
+        elif not args.quiet:
+            print(line, file=sys.stderr, flush=True)
+
+    options = {"offline": args.offline or None, "on_progress": on_progress, "restart": args.restart,
+               "max_workers": args.workers, "on_title": on_progress if show else None}
+    if args.batch_size:
+        options["batch_size"] = args.batch_size
+    if args.csv or args.source.lower().endswith(".csv"):
+        error = importer.check_columns(data, args.ranked)
+        if error:
+            sys.exit(error)
+        checkpoint = importer.import_csv(data, ranked=args.ranked, **options)
+    else:
+        titles = [t.strip() for t in data.decode("utf-8").splitlines() if t.strip()]
+        checkpoint = importer.import_titles(titles, **options)
+    if show:
+        print(file=sys.stderr)
+
+    print(progress_line(checkpoint, time.perf_counter() - start))
+    for problem in checkpoint.problems:
+        detail = f" ({problem['Detail']})" if problem["Detail"] else ""
+        print(f"  {problem['Status']:<9} {problem['Title']}{detail}")
+    return 1 if checkpoint.counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
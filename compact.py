@@ -0,0 +1,104 @@
+# compact.py
+# Compact layout for the Genre and Cast list columns. With pyarrow
+# installed, a list column is an Arrow list of dictionary-encoded strings:
+# per-row offsets plus one int32 id per item into a table of distinct
+# names, so an actor credited in a thousand movies is stored once instead
+# of as a thousand Python strings inside a thousand Python lists. Without
+# pyarrow the columns stay Python lists. list_codes() reads either layout
+# as flat integer codes, which is what the index and aggregates consume.
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # lists stay Python lists
+    pa = None
+
+CODED_TYPE = pa.list_(pa.dictionary(pa.int32(), pa.string())) if pa is not None else None
+
+
+def is_coded(series):
+    if pa is None or not isinstance(series.dtype, pd.ArrowDtype):
+        return False
+    arrow_type = series.dtype.pyarrow_dtype
+    return pa.types.is_list(arrow_type) and pa.types.is_dictionary(arrow_type.value_type)
+
+
+def coded_lists(lists, index=None):
+    """Return ``lists`` (a sequence of lists of str) as a list column in the compact layout."""
+    if pa is None:
+        return pd.Series(list(lists), index=index, dtype=object)
+    flat = pa.array(list(lists), type=pa.list_(pa.string()))
+    coded = pa.ListArray.from_arrays(flat.offsets, flat.values.dictionary_encode())
+    return pd.Series(pd.arrays.ArrowExtensionArray(coded), index=index)
+
+
+def coded_from_arrow(array):
+    """Convert an Arrow list<string> or list<dictionary> (chunked) array to the compact layout."""
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    coded = []
+    for chunk in chunks:
+        chunk = chunk.fill_null(pa.scalar([], chunk.type)) if chunk.null_count else chunk
+        values = chunk.flatten()
+        if not pa.types.is_dictionary(values.type):
+            values = values.dictionary_encode()
+        offsets = pc.subtract(chunk.offsets, chunk.offsets[0])
+        coded.append(pa.ListArray.from_arrays(offsets, values.cast(CODED_TYPE.value_type)))
+    return pd.arrays.ArrowExtensionArray(pa.chunked_array(coded, type=CODED_TYPE))
+
+
+def sorted_codes(values, codes):
+    """Drop unused ``values``, sort the rest, and renumber ``codes`` to match."""
+    used = np.bincount(codes, minlength=len(values)) > 0
+    values = values[used]
+    order = np.argsort(values, kind="stable")
+    remap = np.full(len(used), -1, dtype=np.int64)
+    remap[np.flatnonzero(used)[order]] = np.arange(len(order))
+    return values[order], remap[codes]
+
+
+def list_codes(series):
+    """Return (values, codes, lengths) for a list column in either layout.
+
+    ``values`` are the distinct items, sorted; ``codes`` index ``values``
+    for every item of every row, in row order; ``lengths`` are the items per
+    row. No Python object is created per item for coded columns.
+    """
+    if is_coded(series):
+        array = pa.chunked_array(series.array.__arrow_array__())
+        pools, codes, lengths, base = [], [], [], 0
+        for chunk in array.chunks:
+            lengths.append(pc.list_value_length(chunk).fill_null(0).to_numpy().astype(np.int64))
+            flat = chunk.flatten()
+            pools.append(flat.dictionary.to_numpy(zero_copy_only=False))
+            codes.append(flat.indices.to_numpy().astype(np.int64) + base)
+            base += len(flat.dictionary)
+        if not pools:
+            return np.array([], dtype=object), np.array([], dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # Chunks (e.g. a loaded base plus appended segments) have their own name tables
+        values, inverse = np.unique(np.concatenate(pools).astype(object), return_inverse=True)
+        codes = inverse[np.concatenate(codes)]
+        return (*sorted_codes(values, codes), np.concatenate(lengths))
+    lists = [v if isinstance(v, (list, tuple)) else [] for v in series]
+    lengths = np.fromiter((len(v) for v in lists), dtype=np.int64, count=len(lists))
+    items = np.array([item for values in lists for item in values], dtype=object)
+    if not len(items):
+        return np.array([], dtype=object), np.array([], dtype=np.int64), lengths
+    values, codes = np.unique(items, return_inverse=True)
+    return values, codes, lengths
+
+
+def category_codes(series):
+    """Return (values, codes, rows) for a categorical column, skipping missing and empty values."""
+    categorical = series.astype("category") if not isinstance(series.dtype, pd.CategoricalDtype) else series
+    codes = categorical.cat.codes.to_numpy().astype(np.int64)
+    values = categorical.cat.categories.to_numpy(dtype=object)
+    # Missing values have code -1; empty strings count as missing too
+    keep = (codes >= 0) & ~np.isin(codes, np.flatnonzero(values == ""))
+    rows = np.flatnonzero(keep)
+    codes = codes[rows]
+    if not len(codes):
+        return np.array([], dtype=object), codes, rows
+    values, codes = sorted_codes(values, codes)
+    return values, codes, rows
@@ -0,0 +1,32 @@
+# filter_engine.py
+# Vectorized filtering shared by the sidebar filters and the analytics tab.
+# Range filters compile to NumPy boolean masks and genre, director and cast
+# membership is answered from the inverted index's posting lists instead of
+# a Python call per row.
+import numpy as np
+import pandas as pd
+from inverted_index import InvertedIndex
+
+
+def range_mask(values, bounds):
+    # Missing values never fall inside a range, as with the old row filter
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return (values >= bounds[0]) & (values <= bounds[1])
+
+
+def compile_mask(df, year_range=None, budget_range=None, box_office_range=None,
+                 genres=(), directors=(), actors=(), index=None):
+    """Return a boolean mask over ``df`` rows matching every given filter.
+
+    ``index`` is the InvertedIndex for df; it is built on the fly if omitted.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, bounds in (("Year", year_range), ("Budget", budget_range), ("Box Office", box_office_range)):
+        if bounds is not None:
+            mask &= range_mask(df[col], bounds)
+    for field, wanted in (("Genre", genres), ("Director", directors), ("Cast", actors)):
+        if wanted:
+            if index is None:
+                index = InvertedIndex.build(df)
+            mask &= index.rows_with_any(field, wanted, df)
+    return mask
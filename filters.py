@@ -1,30 +1,19 @@
 import streamlit as st
-import pandas as pd
-import ast
+from filter_engine import compile_mask
+from backend import load_index
+import perf
 
 def apply_filters(df):
-    # Parse list-type columns if needed
-    def parse_list_column(col):
-        return col.apply(lambda x: ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else [])
-
-    if "Genre" in df.columns:
-        df["Genre"] = parse_list_column(df["Genre"])
-    else:
-        df["Genre"] = [[]] * len(df)
-    
-    if "Cast" in df.columns:
-        df["Cast"] = parse_list_column(df["Cast"])
-    else:
-        df["Cast"] = [[]] * len(df)
-
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-    df["Budget"] = pd.to_numeric(df["Budget"].astype(str).str.replace("[$,]", "", regex=True), errors="coerce")
-    df["Box Office"] = pd.to_numeric(df["Box Office"].astype(str).str.replace("[$,]", "", regex=True), errors="coerce")
+    # df is the normalized collection frame (see schema.normalize); it is
+    # returned unchanged alongside the filtered copy.
 
     # Unique filter values
-    all_genres = sorted({g for genres in df["Genre"].dropna() for g in genres})
-    all_cast = sorted({c for cast in df["Cast"].dropna() for c in cast})
-    all_directors = sorted(df["Director"].dropna().unique())
+    with perf.span("filters: index") as span:
+        index = load_index(df)
+        span.record(rows=len(df), nbytes=index.nbytes)
+    all_genres = index.options("Genre")
+    all_cast = index.options("Cast")
+    all_directors = index.options("Director")
 
     with st.sidebar:
         st.markdown("## 🔍 Filters")
@@ -48,15 +37,11 @@ def apply_filters(df):
         director_filter = st.multiselect("Directors", all_directors, key="filter_director")
         actor_filter = st.multiselect("Actors", all_cast, key="filter_actor")
 
-    def matches(row):
-        return (
-            year_range[0] <= row["Year"] <= year_range[1]
-            and budget_range[0] <= row["Budget"] <= budget_range[1]
-            and box_office_range[0] <= row["Box Office"] <= box_office_range[1]
-            and (not genre_filter or any(g in row["Genre"] for g in genre_filter))
-            and (not director_filter or row["Director"] in director_filter)
-            and (not actor_filter or any(a in row["Cast"] for a in actor_filter))
+    with perf.span("filters: mask") as span:
+        mask = compile_mask(
+            df, year_range, budget_range, box_office_range,
+            genre_filter, director_filter, actor_filter, index=index
         )
-
-    filtered_df = df[df.apply(matches, axis=1)].copy()
+        filtered_df = df[mask].copy()
+        span.record(filtered_df)
     return filtered_df, df
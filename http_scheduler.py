@@ -0,0 +1,161 @@
+# http_scheduler.py
+# Rate limiting and retries for the TMDB and OMDb clients. Every provider
+# has one token bucket shared by all fetch threads. Retryable failures
+# (429, 5xx, timeouts, dropped connections) are retried a bounded number of
+# times with jittered exponential backoff. A Retry-After header pauses the
+# provider's whole bucket for that long, so the other threads wait it out
+# too instead of collecting 429s of their own. Kept free of Streamlit.
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Sustained requests per second and burst size per provider. TMDB allows
+# roughly 50 requests per second per client
+PROVIDER_RATES = {
+    "tmdb": (float(os.environ.get("MOVIEGRAPH_TMDB_RATE", 45)), 20),
+    "omdb": (float(os.environ.get("MOVIEGRAPH_OMDB_RATE", 10)), 10),
+}
+REQUEST_TIMEOUT = float(os.environ.get("MOVIEGRAPH_REQUEST_TIMEOUT", 10))
+MAX_ATTEMPTS = int(os.environ.get("MOVIEGRAPH_MAX_ATTEMPTS", 4))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+# A longer Retry-After fails the request instead of stalling the import
+MAX_RETRY_AFTER = 120.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RequestFailed(Exception):
+    """A request that still failed after its retries."""
+
+    def __init__(self, provider, reason, attempts):
+        super().__init__(f"{provider}: {reason} after {attempts} attempt{'s' if attempts != 1 else ''}")
+        self.provider = provider
+        self.reason = reason
+        self.attempts = attempts
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    # Tokens accrue only from the end of a pause, so it ends
+                    # with requests at the sustained rate rather than a burst
+                    elapsed = now - max(self.updated, self.paused_until)
+                    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class RequestStats:
+    """Network activity of one title, filled in by the scheduler."""
+
+    def __init__(self):
+        self.calls = 0  # API calls not answered from the cache
+        self.requests = 0  # HTTP requests sent, retries included
+        self.retries = 0
+        self.waited = 0.0
+        self.warnings = []
+
+
+_current = threading.local()
+
+
+@contextmanager
+def track(stats):
+    # Attribute the requests made on this thread to ``stats``
+    _current.stats = stats
+    try:
+        yield stats
+    finally:
+        _current.stats = None
+
+
+def current_stats():
+    return getattr(_current, "stats", None) or RequestStats()
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or an HTTP date); None if absent or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt):
+    # "Full jitter": spreads retries from many threads instead of syncing them
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class Scheduler:
+    def __init__(self, rates=None, max_attempts=MAX_ATTEMPTS, timeout=REQUEST_TIMEOUT):
+        self.buckets = {p: TokenBucket(*r) for p, r in {**PROVIDER_RATES, **(rates or {})}.items()}
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    def get(self, provider, session, url, params):
+        """GET through the provider's bucket, retrying transient failures.
+
+        Returns the final response, which may still be a non-retryable error
+        such as a 404; raises RequestFailed once the retries are used up.
+        """
+        bucket = self.buckets[provider]
+        stats = current_stats()
+        for attempt in range(self.max_attempts):
+            stats.waited += bucket.acquire()
+            stats.requests += 1
+            try:
+                resp = session.get(url, params=params, timeout=self.timeout)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                reason, delay = type(e).__name__, backoff_delay(attempt)
+            else:
+                if resp.status_code not in RETRY_STATUSES:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+                retry_after = retry_after_seconds(resp.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                    raise RequestFailed(provider, f"{reason}, Retry-After {retry_after:.0f}s", attempt + 1)
+                if retry_after is not None and attempt + 1 < self.max_attempts:
+                    # The quota is shared, so every thread waits it out
+                    bucket.pause(retry_after)
+                delay = 0.0 if retry_after is not None else backoff_delay(attempt)
+            if attempt + 1 < self.max_attempts:
+                stats.retries += 1
+                time.sleep(delay)
+        raise RequestFailed(provider, reason, self.max_attempts)
@@ -0,0 +1,60 @@
+# import_panel.py
+# Streamlit view of the background import jobs (see jobs.py), shared by
+# the Data Management and Top 100 tabs. The panel is a fragment that polls
+# the queue once a second while a job is active, so progress updates
+# without rerunning the page; the page reruns once a job finishes so its
+# movies show up everywhere.
+import streamlit as st
+import pandas as pd
+from jobs import queue
+from tmdb_api import response_cache
+
+POLL_SECONDS = 1.0
+
+
+def import_summary(checkpoint):
+    counts = checkpoint.counts
+    return (
+        f"Added {counts['added']}, skipped {counts['skipped']}, not found {counts['not_found']}, "
+        f"failed {counts['failed']} · API calls {checkpoint.calls}, retries {checkpoint.retries}"
+    )
+
+
+def show_job(job):
+    checkpoint = job.checkpoint
+    st.progress(job.progress(), text=f"#{job.id} {job.label} · {job.status}")
+    if checkpoint is not None:
+        st.caption(import_summary(checkpoint))
+    if job.active:
+        st.button("Cancel", key=f"cancel_import_{job.id}", on_click=queue.cancel, args=(job.id,))
+    elif job.status == "failed":
+        st.error(f"Import failed: {job.error}")
+    elif job.status == "cancelled":
+        st.info("Cancelled. Submit the same titles or file again to resume where it stopped.")
+    if checkpoint is not None and checkpoint.problems:
+        with st.expander(f"Skipped, not found and failed titles (#{job.id})"):
+            st.dataframe(pd.DataFrame(checkpoint.problems), use_container_width=True)
+
+
+def render_jobs(kinds):
+    jobs = [j for j in queue.jobs() if j.kind in kinds]
+    active = {j.id for j in jobs if j.active}
+    state_key = f"import_jobs_active_{'_'.join(kinds)}"
+    was_active = st.session_state.get(state_key, set())
+    st.session_state[state_key] = active
+    if was_active - active:
+        # A job finished since the last poll: refresh the whole page
+        st.rerun()
+    if not jobs:
+        return
+    st.subheader("Imports")
+    stats = response_cache.stats()
+    st.caption(f"Lookup cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    for job in reversed(jobs):
+        show_job(job)
+
+
+def jobs_panel(kinds):
+    """Show the import jobs of the given kinds, polling while any is active."""
+    polling = any(j.active and j.kind in kinds for j in queue.jobs())
+    st.fragment(render_jobs, run_every=POLL_SECONDS if polling else None)(kinds)
@@ -0,0 +1,245 @@
+# importer.py
+# Streaming, resumable imports of uploaded CSVs and pasted title lists.
+# The source is read in chunks; titles are enriched and committed to the
+# backend in batches, with a checkpoint written after every batch, so an
+# interrupted import resumes where it stopped and memory is bounded by the
+# chunk size rather than the upload. Files in the legacy
+# final_movie_data.csv format already carry full records and are converted
+# with schema.from_legacy instead of being fetched.
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+import perf
+from backend import DATA_DIR, load_data, load_title_index, upsert_movies, delete_movies_where, record_rankings
+from schema import KEY_COLUMN, from_legacy, is_legacy_frame
+from storage import atomic_write
+from tmdb_api import fetch_movies_report
+
+CHECKPOINT_DIR = os.path.join(DATA_DIR, "imports")
+# Rows read from the source at a time, and titles fetched per commit
+CHUNK_ROWS = int(os.environ.get("MOVIEGRAPH_IMPORT_CHUNK_ROWS", 500))
+BATCH_SIZE = int(os.environ.get("MOVIEGRAPH_IMPORT_BATCH_SIZE", 50))
+# Skipped, not-found and failed titles listed in the report; the rest are only counted
+MAX_PROBLEMS = 200
+
+
+class Checkpoint:
+    """Progress of one import, saved after every committed batch."""
+
+    def __init__(self, key, total_rows=None):
+        self.key = key
+        self.total_rows = total_rows
+        self.rows_done = 0
+        self.rows_fetching = 0  # rows of the current batch already fetched; not saved
+        self.counts = {"added": 0, "skipped": 0, "not_found": 0, "failed": 0}
+        self.calls = 0
+        self.retries = 0
+        self.problems = []  # {"Title", "Status", "Detail"}, at most MAX_PROBLEMS
+        self.cleared = False  # ranked imports: previous ranks removed
+        self.finished = False
+
+    @staticmethod
+    def path(key, directory=CHECKPOINT_DIR):
+        return os.path.join(directory, f"{key}.json")
+
+    @classmethod
+    def load(cls, key, directory=CHECKPOINT_DIR):
+        """Return the saved checkpoint for ``key``, or None."""
+        try:
+            with open(cls.path(key, directory)) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        checkpoint = cls(key)
+        checkpoint.__dict__.update(state)
+        return checkpoint
+
+    def save(self, directory=CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump({k: v for k, v in self.__dict__.items() if k != "rows_fetching"}, f)
+        atomic_write(self.path(self.key, directory), write)
+
+    def note(self, status, title, detail=""):
+        self.counts[status] += 1
+        if status != "added" and len(self.problems) < MAX_PROBLEMS:
+            self.problems.append({"Title": title, "Status": status, "Detail": detail})
+
+    def progress(self):
+        rows = self.rows_done + self.rows_fetching
+        return min(1.0, rows / self.total_rows) if self.total_rows else 0.0
+
+
+def source_key(kind, data):
+    return f"{kind}-{hashlib.sha256(data).hexdigest()[:20]}"
+
+
+def check_columns(data, ranked=False):
+    """Return an error message if the CSV cannot be imported, else None."""
+    try:
+        columns = pd.read_csv(io.BytesIO(data), nrows=0).columns
+    except (ValueError, pd.errors.ParserError):
+        return "The file is not a readable CSV."
+    if "title_input" in columns and "Title" not in columns:
+        return None if not ranked or "Rank" in columns else "CSV must contain a 'Rank' column."
+    required = ["Rank", "Title"] if ranked else ["Title"]
+    if not all(col in columns for col in required):
+        return f"CSV must contain {' and '.join(repr(c) for c in required)} column{'s' if ranked else ''}."
+    return None
+
+
+def import_csv(data, ranked=False, offline=None, on_progress=None, restart=False,
+               chunk_rows=CHUNK_ROWS, batch_size=BATCH_SIZE, directory=CHECKPOINT_DIR, max_workers=None,
+               on_title=None):
+    """Import an uploaded CSV (bytes) with a Title column, or a legacy export.
+
+    ``ranked`` imports replace the current Top 100: previously ranked movies
+    are removed once, and each row's Rank is kept.
+    """
+    key = source_key("ranked" if ranked else "csv", data)
+    # Line count as a progress estimate; quoted fields may span lines
+    total_rows = max(1, data.count(b"\n") - 1)
+    chunks = pd.read_csv(io.BytesIO(data), chunksize=chunk_rows)
+    return run_import(key, chunks, total_rows, ranked, offline, on_progress, restart, batch_size, directory, max_workers,
+                      on_title)
+
+
+def import_titles(titles, offline=None, on_progress=None, restart=False,
+                  chunk_rows=CHUNK_ROWS, batch_size=BATCH_SIZE, directory=CHECKPOINT_DIR, max_workers=None,
+                  on_title=None):
+    """Import a list of titles, e.g. pasted one per line."""
+    titles = list(titles)
+    key = source_key("titles", "\n".join(titles).encode("utf-8"))
+    chunks = (pd.DataFrame({"Title": titles[i:i + chunk_rows]}) for i in range(0, len(titles), chunk_rows))
+    return run_import(key, chunks, len(titles), False, offline, on_progress, restart, batch_size, directory, max_workers,
+                      on_title)
+
+
+def run_import(key, chunks, total_rows=None, ranked=False, offline=None, on_progress=None,
+               restart=False, batch_size=BATCH_SIZE, directory=CHECKPOINT_DIR, max_workers=None, on_title=None):
+    """Commit ``chunks`` (DataFrames) batch by batch, resuming from a checkpoint.
+
+    A finished import is not repeated unless ``restart`` is set; an
+    unfinished one always resumes after its last committed batch.
+    ``max_workers`` caps the titles fetched in parallel (default
+    tmdb_api.MAX_CONCURRENCY). ``on_progress(checkpoint)`` is called after
+    every committed batch, ``on_title(checkpoint)`` as each title of a batch
+    is fetched (``checkpoint.rows_fetching`` counts them).
+    """
+    checkpoint = Checkpoint.load(key, directory)
+    if checkpoint is None or (checkpoint.finished and restart):
+        checkpoint = Checkpoint(key, total_rows)
+    if checkpoint.finished:
+        return checkpoint
+    if ranked and not checkpoint.cleared:
+        delete_movies_where(lambda existing: existing["Rank"].notna())
+        checkpoint.cleared = True
+        checkpoint.save(directory)
+
+    # Built once per import and kept current with each committed batch;
+    # reloading them per batch would cost a full collection load each time
+    seen_ids = set()
+    existing_ids = set(load_data()[KEY_COLUMN])
+    title_index = load_title_index().copy()
+    position = 0
+    for chunk in chunks:
+        start, position = position, position + len(chunk)
+        if position <= checkpoint.rows_done:
+            continue
+        chunk = chunk.iloc[max(0, checkpoint.rows_done - start):]
+        legacy = is_legacy_frame(chunk)
+        for offset in range(0, len(chunk), batch_size):
+            batch = chunk.iloc[offset:offset + batch_size]
+            with perf.span("import batch") as span:
+                if legacy:
+                    rows = legacy_rows(batch, checkpoint)
+                else:
+                    rows = enrich(batch, ranked, offline, checkpoint, seen_ids, existing_ids, title_index, max_workers,
+                                  on_title)
+                if len(rows):
+                    upsert_movies(rows)
+                    existing_ids.update(rows[KEY_COLUMN])
+                    title_index.add_movies(rows[KEY_COLUMN], rows["Title"])
+                span.record(rows)
+            checkpoint.rows_done += len(batch)
+            checkpoint.rows_fetching = 0
+            checkpoint.save(directory)
+            if on_progress:
+                on_progress(checkpoint)
+    checkpoint.finished = True
+    checkpoint.save(directory)
+    if ranked:
+        record_rankings("import")
+    return checkpoint
+
+
+def legacy_rows(batch, checkpoint):
+    rows = from_legacy(batch)
+    rows["Date Added"] = rows["Date Added"].fillna(datetime.now().strftime("%Y-%m-%d"))
+    for title in rows["Title"]:
+        checkpoint.note("added", title)
+    return rows
+
+
+def enrich(batch, ranked, offline, checkpoint, seen_ids, existing_ids, title_index, max_workers=None, on_title=None):
+    """Fetch the batch's titles; return the rows to commit.
+
+    ``existing_ids`` and ``title_index`` describe the collection as of the
+    last committed batch.
+    """
+    titles = batch["Title"].fillna("").astype(str).str.strip().tolist()
+    ranks = batch["Rank"].tolist() if ranked else [None] * len(titles)
+
+    to_fetch, fetch_ids, fetch_ranks = [], [], []
+    for title, rank in zip(titles, ranks):
+        if not title:
+            continue
+        match = title_index.resolve(title)
+        # A ranked import re-ranks movies it already has; others skip them
+        if match and not ranked and (match.in_collection or match.movie_id in seen_ids):
+            checkpoint.note("skipped", title, "" if match.score == 100 else f"as {match.title}")
+            continue
+        if match:
+            seen_ids.add(match.movie_id)
+        to_fetch.append(title)
+        fetch_ids.append(match.movie_id if match else None)
+        fetch_ranks.append(rank)
+
+    # Blank and skipped rows count as fetched straight away
+    resolved = len(titles) - len(to_fetch)
+
+    def fetched(done, total):
+        checkpoint.rows_fetching = resolved + done
+        if on_title:
+            on_title(checkpoint)
+    fetched(0, len(to_fetch))
+
+    records = []
+    today = datetime.now().strftime("%Y-%m-%d")
+    outcomes = fetch_movies_report(to_fetch, max_workers, fetched, offline=offline, movie_ids=fetch_ids)
+    for outcome, rank in zip(outcomes, fetch_ranks):
+        checkpoint.calls += outcome.stats.calls
+        checkpoint.retries += outcome.stats.retries
+        data = outcome.data
+        if outcome.status == "failed":
+            checkpoint.note("failed", outcome.title, outcome.error)
+        elif not data:
+            checkpoint.note("not_found", outcome.title, "not cached" if outcome.status == "not_cached" else "")
+        elif not ranked and data[KEY_COLUMN] in existing_ids:
+            checkpoint.note("skipped", outcome.title, f"as {data['Title']}")
+        else:
+            data["Date Added"] = today
+            if ranked:
+                data["Rank"] = rank
+            existing_ids.add(data[KEY_COLUMN])
+            seen_ids.add(data[KEY_COLUMN])
+            checkpoint.note("added", outcome.title)
+            records.append(data)
+    return pd.DataFrame(records)
@@ -0,0 +1,84 @@
+# inflation.py
+# Inflation adjustment of the money columns from a local CPI table. The
+# table is a CSV of annual average CPI by year (cpi_us.csv); its version is
+# a hash of the file, so editing or replacing it is detected without any
+# bookkeeping. Adjusted values are computed for a whole frame in one array
+# operation: each movie's year indexes a dense factor array
+# (CPI of the base year / CPI of the release year).
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+CPI_PATH = os.environ.get("MOVIEGRAPH_CPI_PATH", "cpi_us.csv")
+
+# (money column, adjusted column) pairs
+ADJUSTED_COLUMNS = [("Box Office", "Box Office (Adj)"), ("Budget", "Budget (Adj)")]
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+class CpiTable:
+    """Annual CPI values for consecutive years."""
+
+    def __init__(self, years, cpi, version):
+        order = np.argsort(years)
+        years = np.asarray(years, dtype=np.int64)[order]
+        cpi = np.asarray(cpi, dtype="float64")[order]
+        self.first_year = int(years[0])
+        self.last_year = int(years[-1])
+        # Dense by year; gaps take the previous known year's value
+        dense = np.full(self.last_year - self.first_year + 1, np.nan)
+        dense[years - self.first_year] = cpi
+        self.cpi = pd.Series(dense).ffill().to_numpy()
+        self.version = version
+
+    @classmethod
+    def read(cls, path=CPI_PATH):
+        with open(path, "rb") as f:
+            content = f.read()
+        table = pd.read_csv(path, comment="#")
+        version = f"{os.path.basename(path)}:{hashlib.sha1(content).hexdigest()[:12]}"
+        return cls(table["year"].to_numpy(), table["cpi"].to_numpy(), version)
+
+    def factors(self, years, base_year):
+        """Multipliers to ``base_year`` dollars for an array of years (NaN where unknown).
+
+        Years outside the table are clamped to its first or last year.
+        """
+        years = pd.to_numeric(pd.Series(years), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        known = ~np.isnan(years)
+        positions = np.clip(np.nan_to_num(years) - self.first_year, 0, len(self.cpi) - 1).astype(np.int64)
+        base = self.cpi[min(max(int(base_year) - self.first_year, 0), len(self.cpi) - 1)]
+        return np.where(known, base / self.cpi[positions], np.nan)
+
+
+def load_table(path=CPI_PATH):
+    """The CPI table at ``path``, re-read only when the file changes; None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _tables_lock:
+        if key not in _tables:
+            _tables.clear()
+            _tables[key] = CpiTable.read(path)
+        return _tables[key]
+
+
+def adjust(df, table, base_year):
+    """Return df with the adjusted money columns recomputed in ``base_year`` dollars.
+
+    Amounts are rounded to whole dollars; a missing amount or year leaves
+    the adjusted value missing.
+    """
+    factors = table.factors(df["Year"], base_year)
+    df = df.copy()
+    for column, adjusted in ADJUSTED_COLUMNS:
+        amounts = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        df[adjusted] = np.round(amounts * factors)
+    return df
@@ -0,0 +1,190 @@
+# inverted_index.py
+# Posting lists from each genre, cast member and director to the movies
+# they appear in, so option lists and membership filters never walk every
+# row's Cast list.
+import weakref
+import numpy as np
+import pandas as pd
+from compact import category_codes, list_codes
+from schema import KEY_COLUMN
+
+FIELDS = ("Genre", "Cast", "Director")
+
+
+def flatten(df, field):
+    """Return (values, codes, rows): row ``rows[i]`` has ``values[codes[i]]``.
+
+    ``values`` are sorted and distinct. Works on the integer codes of the
+    compact layout, so no Python object is created per item.
+    """
+    if field == "Director":
+        return category_codes(df[field])
+    values, codes, lengths = list_codes(df[field])
+    return values, codes, np.repeat(np.arange(len(lengths)), lengths)
+
+
+class PostingLists:
+    """CSC layout: movies of ``values[i]`` are ``postings[offsets[i]:offsets[i + 1]]``.
+
+    Postings are positions into the owning index's movie id table.
+    """
+
+    def __init__(self, values, offsets, postings):
+        self.values = values
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def from_codes(cls, values, codes, id_positions):
+        # ``values`` must be sorted
+        order = np.lexsort((id_positions, codes))
+        counts = np.bincount(codes, minlength=len(values))
+        # Values left without postings drop out of the vocabulary
+        present = counts > 0
+        offsets = np.concatenate([[0], np.cumsum(counts[present])])
+        return cls(values[present], offsets, id_positions[order].astype(np.int64))
+
+    def codes(self):
+        return np.repeat(np.arange(len(self.values)), np.diff(self.offsets))
+
+    def lookup(self, items):
+        items = np.array(list(items), dtype=object)
+        if not len(items) or not len(self.values):
+            return np.array([], dtype=np.int64)
+        pos = np.searchsorted(self.values, items).clip(max=len(self.values) - 1)
+        return pos[self.values[pos] == items]
+
+    def get(self, items):
+        """Id positions of movies containing any of ``items``."""
+        codes = self.lookup(items)
+        if not len(codes):
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate([self.postings[self.offsets[c]:self.offsets[c + 1]] for c in codes]))
+
+    def without(self, dead):
+        # ``dead`` is a boolean mask over id positions
+        keep = ~dead[self.postings]
+        codes = self.codes()[keep]
+        return PostingLists.from_codes(self.values, codes, self.postings[keep])
+
+    def merged(self, values, codes, id_positions):
+        if not len(codes):
+            return self
+        added = values
+        values = np.union1d(self.values, added)
+        codes = np.concatenate([
+            np.searchsorted(values, self.values)[self.codes()],
+            np.searchsorted(values, added)[codes],
+        ])
+        postings = np.concatenate([self.postings, id_positions])
+        return PostingLists.from_codes(values, codes, postings)
+
+
+class InvertedIndex:
+    def __init__(self, ids, fields):
+        self.ids = ids  # movie id of every id position
+        self.fields = fields  # field -> PostingLists
+        self._row_map = None
+
+    @classmethod
+    def build(cls, df):
+        ids = df[KEY_COLUMN].to_numpy(dtype=object)
+        fields = {}
+        for field in FIELDS:
+            values, codes, rows = flatten(df, field)
+            fields[field] = PostingLists.from_codes(values, codes, rows)
+        return cls(ids, fields)
+
+    def __len__(self):
+        return int((self.ids != "").sum())
+
+    @property
+    def nbytes(self):
+        return self.ids.nbytes + sum(
+            p.values.nbytes + p.offsets.nbytes + p.postings.nbytes for p in self.fields.values()
+        )
+
+    def options(self, field):
+        return self.fields[field].values.tolist()
+
+    def movie_ids(self, field, items):
+        """Movie ids appearing under any of ``items`` in ``field``."""
+        return self.ids[self.fields[field].get(items)]
+
+    def rows_with_any(self, field, items, df):
+        """Boolean mask over df rows whose ``field`` contains any of ``items``."""
+        mask = np.zeros(len(df), dtype=bool)
+        positions = self.fields[field].get(items)
+        if len(positions):
+            rows = self.row_positions(df)
+            if rows is None:
+                return df[KEY_COLUMN].isin(self.ids[positions]).to_numpy()
+            rows = rows[positions]
+            mask[rows[rows >= 0]] = True
+        return mask
+
+    def row_positions(self, df):
+        """Row of df holding each id position (-1 if absent), cached per frame.
+
+        Returns None when df has duplicate ids and rows cannot be mapped 1:1.
+        """
+        if self._row_map is None or self._row_map[0]() is not df:
+            keys = pd.Index(df[KEY_COLUMN])
+            rows = keys.get_indexer(self.ids) if keys.is_unique else None
+            self._row_map = (weakref.ref(df), rows)
+        return self._row_map[1]
+
+    def remove(self, movie_ids):
+        dead = np.isin(self.ids, np.array(list(movie_ids), dtype=object))
+        if not dead.any():
+            return self
+        # Positions stay put, as the postings refer to them; removed movies
+        # leave an empty id behind
+        ids = self.ids.copy()
+        ids[dead] = ""
+        return InvertedIndex(ids, {f: p.without(dead) for f, p in self.fields.items()})
+
+    def add(self, df):
+        if not len(df):
+            return self
+        ids = np.concatenate([self.ids, df[KEY_COLUMN].to_numpy(dtype=object)])
+        fields = {}
+        for field, postings in self.fields.items():
+            values, codes, rows = flatten(df, field)
+            fields[field] = postings.merged(values, codes, rows + len(self.ids))
+        return InvertedIndex(ids, fields)
+
+    def upsert(self, df):
+        return self.remove(df[KEY_COLUMN]).add(df)
+
+    def apply(self, op, rows):
+        """Apply one storage change ("append", "upsert" or "delete")."""
+        if op == "delete":
+            return self.remove(rows[KEY_COLUMN])
+        if op == "upsert":
+            return self.upsert(rows)
+        return self.add(rows)
+
+    def needs_rebuild(self, op, rows):
+        # Every storage change can be applied to the postings
+        return False
+
+    def to_arrays(self):
+        arrays = {"ids": self.ids.astype(str)}
+        for field, postings in self.fields.items():
+            arrays[f"{field}.values"] = postings.values.astype(str)
+            arrays[f"{field}.offsets"] = postings.offsets
+            arrays[f"{field}.postings"] = postings.postings
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        fields = {
+            field: PostingLists(
+                arrays[f"{field}.values"].astype(object),
+                arrays[f"{field}.offsets"],
+                arrays[f"{field}.postings"],
+            )
+            for field in FIELDS
+        }
+        return cls(arrays["ids"].astype(object), fields)
@@ -0,0 +1,138 @@
+# jobs.py
+# Background import jobs. Imports run on a small worker pool owned by the
+# process instead of inside the Streamlit script run, so a rerun, widget
+# change or page refresh does not abort them and the collection can be
+# browsed while they commit batch by batch. Jobs are process-wide (every
+# session sees them); parallelism is bounded by the pool size here and
+# by the shared per-provider token buckets in http_scheduler.
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import importer
+from tmdb_api import MAX_IMPORT_JOBS
+
+# Finished jobs kept for display
+MAX_FINISHED = 20
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, key, label, kind):
+        self.id = job_id
+        self.key = key  # importer source key
+        self.label = label
+        self.kind = kind  # "titles", "csv" or "ranked"
+        self.status = "queued"  # queued, running, done, failed, cancelled
+        self.checkpoint = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished_at = None
+        self.cancel_requested = False
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        return self.checkpoint.progress() if self.checkpoint is not None else 0.0
+
+    def on_progress(self, checkpoint):
+        # Runs on the worker after every committed batch
+        self.checkpoint = checkpoint
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    def on_title(self, checkpoint):
+        # Runs on the worker as each title of a batch is fetched; the
+        # checkpoint's progress counts those titles too
+        self.checkpoint = checkpoint
+
+
+def resume_note(key):
+    checkpoint = importer.Checkpoint.load(key)
+    if checkpoint is not None and not checkpoint.finished and checkpoint.rows_done:
+        return f" (resuming after row {checkpoint.rows_done})"
+    return ""
+
+
+class JobQueue:
+    def __init__(self, max_workers=MAX_IMPORT_JOBS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, key, label, kind, run):
+        """Queue ``run(on_progress, on_title)``, which returns the import's Checkpoint.
+
+        Submitting a source that is already queued or running returns that
+        job rather than importing it twice.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.active:
+                    return job
+            job = Job(next(self._ids), key, label, kind)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, run)
+        return job
+
+    def _run(self, job, run):
+        if job.cancel_requested:
+            job.status = "cancelled"
+        else:
+            job.status = "running"
+            try:
+                job.checkpoint = run(job.on_progress, job.on_title)
+                job.status = "done"
+            except JobCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.status, job.error = "failed", str(e)
+        job.finished_at = time.time()
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in finished[:-MAX_FINISHED]:
+            del self._jobs[job.id]
+
+    def cancel(self, job_id):
+        """Stop a job after its current batch; its checkpoint lets it resume later."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel_requested = True
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active(self):
+        return [j for j in self.jobs() if j.active]
+
+
+queue = JobQueue()
+
+
+def submit_titles(titles, offline=None):
+    titles = list(titles)
+    label = f"{len(titles)} title{'s' if len(titles) != 1 else ''}: {', '.join(titles[:3])}{'…' if len(titles) > 3 else ''}"
+    key = importer.source_key("titles", "\n".join(titles).encode("utf-8"))
+    return queue.submit(key, label + resume_note(key), "titles", lambda on_progress, on_title: importer.import_titles(
+        titles, offline=offline, restart=True, on_progress=on_progress, on_title=on_title
+    ))
+
+
+def submit_csv(data, name, ranked=False, offline=None):
+    kind = "ranked" if ranked else "csv"
+    key = importer.source_key(kind, data)
+    return queue.submit(key, name + resume_note(key), kind, lambda on_progress, on_title: importer.import_csv(
+        data, ranked=ranked, offline=offline, restart=True, on_progress=on_progress, on_title=on_title
+    ))
@@ -0,0 +1,87 @@
+# memo.py
+# Process-wide memoization of the loaded collection and the aggregates
+# derived from it. Keys include the backend version (see Store.version), so
+# an unchanged dataset is never re-read or re-aggregated across reruns,
+# and any write naturally misses the old entries; backend writes also
+# invalidate explicitly so stale frames are freed right away.
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_ENTRIES = int(os.environ.get("MOVIEGRAPH_MEMO_ENTRIES", 64))
+MAX_BYTES = int(os.environ.get("MOVIEGRAPH_MEMO_BYTES", 512 * 1024 * 1024))
+
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, tuple):
+        return sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """Thread-safe LRU bounded by entry count and estimated size."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Return the cached value for ``key``, computing it on a miss.
+
+        Cached values are shared between reruns and sessions; callers must
+        treat them as read-only.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = compute()
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+
+cache = MemoCache()
+
+
+def memoize_for(df, key, compute):
+    """Memoize a value derived from a frame returned by backend.load_data.
+
+    The frame's data version is part of the key; frames that did not come
+    from the backend carry no version and are computed every time.
+    """
+    version = df.attrs.get("data_version")
+    if version is None:
+        return compute()
+    return cache.get((version,) + tuple(key), compute)
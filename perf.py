@@ -0,0 +1,155 @@
+# perf.py
+# Lightweight timing spans. A rerun of the app is recorded as a Trace: a
+# flat list of named spans with their nesting depth, duration, and the
+# rows and bytes they handled. Whether a rerun is traced is decided per
+# rerun (each session has its own panel toggle) and kept thread-locally,
+# and traces are stored per session, so sessions neither switch tracing
+# for each other nor see each other's reruns. Spans opened on a thread
+# outside any rerun (import workers, API calls) go to a bounded
+# background list, recorded while MOVIEGRAPH_PERF is set or some session
+# has traced a rerun within BACKGROUND_WINDOW seconds. Untraced spans get
+# a shared no-op object, so instrumented code pays one lookup per span.
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from memo import estimate_size
+
+# Traces kept per session, and sessions kept
+MAX_TRACES = int(os.environ.get("MOVIEGRAPH_PERF_TRACES", 20))
+MAX_SESSIONS = 32
+MAX_BACKGROUND = 500
+BACKGROUND_WINDOW = 300
+
+# Default for sessions that have not chosen, and always-on background spans
+enabled = os.environ.get("MOVIEGRAPH_PERF", "") not in ("", "0")
+traces = OrderedDict()  # session -> deque of its latest Traces
+background = deque(maxlen=MAX_BACKGROUND)
+
+_current = threading.local()
+_traces_lock = threading.Lock()
+_background_until = 0.0
+
+
+class Trace:
+    def __init__(self, label, session=None):
+        self.label = label
+        self.session = session
+        self.started = time.time()
+        self.seconds = None
+        self.spans = []
+        self.depth = 0
+
+    def as_dict(self):
+        return {"label": self.label, "session": self.session, "started": self.started, "seconds": self.seconds,
+                "spans": self.spans}
+
+
+class Span:
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+        self.rows = None
+        self.nbytes = None
+
+    def record(self, value=None, rows=None, nbytes=None):
+        """Note the rows and bytes handled; sized from ``value`` if given."""
+        if value is not None:
+            rows = len(value) if rows is None and hasattr(value, "__len__") else rows
+            nbytes = estimate_size(value) if nbytes is None else nbytes
+        self.rows = rows if rows is not None else self.rows
+        self.nbytes = nbytes if nbytes is not None else self.nbytes
+
+    def __enter__(self):
+        # Spans are listed in the order they open, so parents precede children
+        self.entry = {"name": self.name, "depth": 0, "seconds": None, "rows": None, "bytes": None,
+                      "thread": threading.current_thread().name}
+        if self.trace is not None:
+            self.entry["depth"] = self.trace.depth
+            self.trace.depth += 1
+            self.trace.spans.append(self.entry)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.entry.update(seconds=time.perf_counter() - self.start, rows=self.rows, bytes=self.nbytes)
+        if self.trace is not None:
+            self.trace.depth -= 1
+        else:
+            self.entry["at"] = time.time()
+            background.append(self.entry)
+        return False
+
+
+class _NoSpan:
+    def record(self, value=None, rows=None, nbytes=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Time the enclosed block as ``name``; a no-op unless this thread's rerun is traced."""
+    trace = getattr(_current, "trace", None)
+    if trace is not None:
+        return Span(name, trace)
+    if getattr(_current, "in_rerun", False) or not (enabled or time.time() < _background_until):
+        return _NO_SPAN
+    return Span(name, None)
+
+
+class rerun:
+    """Record the spans opened on this thread until exit as one Trace of ``session``.
+
+    ``traced`` defaults to MOVIEGRAPH_PERF; untraced reruns record nothing.
+    """
+
+    def __init__(self, label="rerun", traced=None, session=None):
+        self.trace = Trace(label, session) if (enabled if traced is None else traced) else None
+
+    def __enter__(self):
+        global _background_until
+        _current.in_rerun = True
+        _current.trace = self.trace
+        if self.trace is not None:
+            _background_until = time.time() + BACKGROUND_WINDOW
+            self._start = time.perf_counter()
+        return self.trace
+
+    def __exit__(self, *exc):
+        _current.in_rerun = False
+        _current.trace = None
+        if self.trace is not None:
+            self.trace.seconds = time.perf_counter() - self._start
+            with _traces_lock:
+                session_traces = traces.pop(self.trace.session, None) or deque(maxlen=MAX_TRACES)
+                session_traces.append(self.trace)
+                traces[self.trace.session] = session_traces
+                while len(traces) > MAX_SESSIONS:
+                    traces.popitem(last=False)
+        return False
+
+
+def recent(session=None, last=None):
+    """The traces recorded for ``session``, oldest first (the ``last`` N)."""
+    with _traces_lock:
+        recorded = list(traces.get(session, ()))
+    return recorded[-last:] if last else recorded
+
+
+def export_json(session=None, last=None):
+    """Return the traces of ``session`` (the ``last`` N) and background spans as JSON."""
+    recorded = recent(session, last)
+    return json.dumps({
+        "traces": [t.as_dict() for t in recorded],
+        "background": list(background),
+    }, indent=1)
@@ -0,0 +1,78 @@
+# perf_panel.py
+# Opt-in sidebar breakdown of where the last reruns spent their time (see
+# perf.py). Turning the panel on traces this session's reruns from the
+# next one; turning it off makes its spans no-ops again. Other sessions
+# are unaffected.
+import uuid
+
+import streamlit as st
+import pandas as pd
+import perf
+
+RERUNS_SHOWN = 10
+
+
+def span_table(trace):
+    return pd.DataFrame({
+        "Stage": ["  " * s["depth"] + s["name"] for s in trace.spans],
+        "ms": [round(s["seconds"] * 1000, 1) if s["seconds"] is not None else None for s in trace.spans],
+        "Rows": pd.array([s["rows"] for s in trace.spans], dtype="Int64"),
+        "KB": [round(s["bytes"] / 1024, 1) if s["bytes"] is not None else None for s in trace.spans],
+    })
+
+
+def rerun_table(recent):
+    # One row per rerun, one column per top-level stage, in milliseconds
+    rows = []
+    for trace in recent:
+        row = {"Started": pd.Timestamp(trace.started, unit="s").strftime("%H:%M:%S"), "Total": trace.seconds * 1000}
+        for s in trace.spans:
+            if s["depth"] == 0 and s["seconds"] is not None:
+                row[s["name"]] = row.get(s["name"], 0) + s["seconds"] * 1000
+        rows.append(row)
+    return pd.DataFrame(rows).round(1)
+
+
+def background_table():
+    spans = pd.DataFrame(list(perf.background))
+    if spans.empty:
+        return spans
+    return (
+        spans.groupby("name")
+        .agg(Count=("seconds", "size"), Total_ms=("seconds", "sum"), Mean_ms=("seconds", "mean"), KB=("bytes", "sum"))
+        .assign(Total_ms=lambda t: t["Total_ms"] * 1000, Mean_ms=lambda t: t["Mean_ms"] * 1000, KB=lambda t: t["KB"] / 1024)
+        .round(1)
+    )
+
+
+def perf_session():
+    """Id that tags this browser session's traces."""
+    return st.session_state.setdefault("perf_session", uuid.uuid4().hex)
+
+
+def tracing():
+    """Whether this session's reruns are traced (its panel is on)."""
+    return st.session_state.get("perf_panel", perf.enabled)
+
+
+def perf_panel():
+    """Sidebar toggle and, when on, the timing breakdown of this session's recent reruns."""
+    with st.sidebar:
+        if not st.checkbox("⏱️ Performance panel", value=perf.enabled, key="perf_panel"):
+            return
+        recent = perf.recent(perf_session(), RERUNS_SHOWN)
+        if not recent:
+            st.caption("Timing starts with the next rerun.")
+            return
+        last = recent[-1]
+        st.caption(f"Last rerun: {last.seconds * 1000:.0f} ms")
+        st.dataframe(span_table(last), hide_index=True, use_container_width=True)
+        st.caption(f"Last {len(recent)} reruns (ms)")
+        st.dataframe(rerun_table(recent), hide_index=True, use_container_width=True)
+        background = background_table()
+        if not background.empty:
+            st.caption("Background imports and API calls")
+            st.dataframe(background, use_container_width=True)
+        st.download_button(
+            "Export traces (JSON)", perf.export_json(perf_session()), file_name="moviegraph_traces.json", mime="application/json"
+        )
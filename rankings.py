@@ -0,0 +1,148 @@
+# rankings.py
+# Top 100 rank edits and their history. Edits are applied by Movie ID, so
+# remakes sharing a title keep their own ranks, and only movies whose rank
+# actually changed are written back. Every saved ranking is kept as a
+# numbered snapshot (one small file per snapshot plus a JSON index), so
+# listing, loading and diffing past Top 100s never touches the collection.
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from schema import KEY_COLUMN, normalize_title
+from storage import atomic_write, parquet_available
+
+SNAPSHOT_COLUMNS = [KEY_COLUMN, "Title", "Rank"]
+
+
+def resolve_titles(df, titles, title_index=None):
+    """Map typed titles to collection Movie IDs; None where unknown or ambiguous."""
+    by_title = {}
+    for movie_id, title in zip(df[KEY_COLUMN], df["Title"]):
+        by_title.setdefault(normalize_title(title) if isinstance(title, str) else "", []).append(movie_id)
+    ids = []
+    for title in titles:
+        candidates = by_title.get(normalize_title(title), []) if isinstance(title, str) else []
+        if not candidates and title_index is not None and isinstance(title, str):
+            match = title_index.resolve(title)
+            candidates = [match.movie_id] if match and match.in_collection else []
+        ids.append(candidates[0] if len(candidates) == 1 else None)
+    return ids
+
+
+def rank_changes(df, edited, title_index=None):
+    """Return (rows, unmatched) for an edited ranking.
+
+    ``edited`` has Movie ID, Title and Rank columns. Rows keep their Movie
+    ID unless their Title was changed or they were added without one; those
+    are matched by title, and the titles that match no single collection
+    movie are returned in ``unmatched``. ``rows`` are the collection rows
+    whose rank changes, carrying the new rank.
+    """
+    titles = edited["Title"]
+    ids = edited[KEY_COLUMN] if KEY_COLUMN in edited else pd.Series(None, index=edited.index, dtype=object)
+    current = df.set_index(KEY_COLUMN)
+    retyped = ids.map(current["Title"]).ne(titles).to_numpy()
+    ids = ids.to_numpy(dtype=object).copy()
+    if retyped.any():
+        ids[retyped] = resolve_titles(df, titles[retyped], title_index)
+    unmatched = [t for t, movie_id in zip(titles, ids) if movie_id is None and isinstance(t, str) and t.strip()]
+
+    ranks = pd.Series(pd.to_numeric(edited["Rank"], errors="coerce").to_numpy(dtype="float64"), index=ids)
+    ranks = ranks[ranks.index.notna()]
+    ranks = ranks[~ranks.index.duplicated(keep="last")]
+    old = current["Rank"].reindex(ranks.index).to_numpy(dtype="float64", na_value=float("nan"))
+    changed = ranks[~((ranks.to_numpy() == old) | (ranks.isna().to_numpy() & pd.isna(old)))]
+
+    rows = df[df[KEY_COLUMN].isin(changed.index)].copy()
+    rows["Rank"] = rows[KEY_COLUMN].map(changed)
+    return rows, unmatched
+
+
+class RankHistory:
+    """Numbered snapshots of the ranked movies, oldest first."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.suffix = ".parquet" if parquet_available() else ".csv"
+        self._lock = threading.Lock()
+
+    def _index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _path(self, entry):
+        return os.path.join(self.directory, entry["file"])
+
+    def record(self, df, source):
+        """Snapshot the ranked rows of ``df``; returns the new version, or None if unchanged."""
+        ranked = df.loc[df["Rank"].notna(), SNAPSHOT_COLUMNS].sort_values(["Rank", KEY_COLUMN])
+        ranked = ranked.reset_index(drop=True).astype({"Rank": "float64"})
+        with self._lock:
+            index = self._index()
+            if index:
+                latest = self.snapshot(index[-1]["version"], index)
+                if (len(latest) == len(ranked)
+                        and (latest[KEY_COLUMN].to_numpy() == ranked[KEY_COLUMN].to_numpy()).all()
+                        and (latest["Rank"].to_numpy() == ranked["Rank"].to_numpy()).all()):
+                    return None
+            version = index[-1]["version"] + 1 if index else 1
+            entry = {
+                "version": version,
+                "saved_at": datetime.now().isoformat(timespec="seconds"),
+                "source": source,
+                "movies": len(ranked),
+                "file": f"{version:06d}{self.suffix}",
+            }
+            if self.suffix == ".parquet":
+                atomic_write(self._path(entry), lambda tmp: ranked.to_parquet(tmp, index=False))
+            else:
+                atomic_write(self._path(entry), lambda tmp: ranked.to_csv(tmp, index=False))
+
+            def write(tmp):
+                with open(tmp, "w") as f:
+                    json.dump(index + [entry], f, indent=1)
+            atomic_write(self.index_path, write)
+            return version
+
+    def snapshots(self):
+        """One row per snapshot: version, saved_at, source and movies."""
+        index = self._index()
+        return pd.DataFrame(index, columns=["version", "saved_at", "source", "movies", "file"]).drop(columns="file")
+
+    def snapshot(self, version, index=None):
+        """The ranked movies of snapshot ``version``, in rank order."""
+        entry = next(e for e in (index if index is not None else self._index()) if e["version"] == version)
+        path = self._path(entry)
+        if path.endswith(".parquet"):
+            out = pd.read_parquet(path)
+        else:
+            out = pd.read_csv(path, dtype={KEY_COLUMN: str, "Title": str})
+        out["Rank"] = out["Rank"].astype("float64")
+        return out[SNAPSHOT_COLUMNS]
+
+    def diff(self, old_version, new_version):
+        """Rank movements from ``old_version`` to ``new_version``.
+
+        Movement is positive for movies that climbed; movies only in one
+        snapshot are marked new or dropped.
+        """
+        old = self.snapshot(old_version)
+        new = self.snapshot(new_version)
+        merged = old.merge(new, on=KEY_COLUMN, how="outer", suffixes=(" (old)", " (new)"), indicator=True)
+        merged["Title"] = merged["Title (new)"].fillna(merged["Title (old)"])
+        merged["Movement"] = merged["Rank (old)"] - merged["Rank (new)"]
+        merged["Change"] = merged["_merge"].map({"left_only": "dropped", "right_only": "new", "both": ""}).astype(object)
+        moved = merged["_merge"].eq("both") & merged["Movement"].ne(0)
+        merged.loc[moved, "Change"] = merged.loc[moved, "Movement"].map(lambda m: f"{m:+.0f}")
+        return (
+            merged[[KEY_COLUMN, "Title", "Rank (old)", "Rank (new)", "Movement", "Change"]]
+            .sort_values(["Rank (new)", "Rank (old)"], na_position="last")
+            .reset_index(drop=True)
+        )
@@ -0,0 +1,126 @@
+# response_cache.py
+# Persistent SQLite cache for TMDB/OMDb responses, so re-importing a known
+# title (or retrying a failed upload) does not hit the network again.
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get("MOVIEGRAPH_CACHE_PATH", "data/http_cache.sqlite")
+MAX_CACHE_BYTES = int(os.environ.get("MOVIEGRAPH_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+DAY = 24 * 60 * 60
+# Seconds a cached response stays fresh, per endpoint. Search results
+# rarely change; box office (tmdb_movie, which carries the credits too)
+# and ratings drift over time.
+DEFAULT_TTLS = {
+    "tmdb_search": 30 * DAY,
+    "tmdb_movie": 7 * DAY,
+    "omdb": 3 * DAY,
+}
+FALLBACK_TTL = 7 * DAY
+
+# Parameters that do not affect the response and must not end up in keys
+IGNORED_PARAMS = {"api_key", "apikey"}
+
+
+class OfflineCacheMiss(LookupError):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+def normalize_value(value):
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+
+def make_key(endpoint, params):
+    params = {
+        k: normalize_value(v) for k, v in (params or {}).items()
+        if k not in IGNORED_PARAMS and v not in (None, "")
+    }
+    return endpoint + ":" + json.dumps(params, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttls=None, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, endpoint TEXT, payload TEXT, size INTEGER,"
+                " created REAL, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, endpoint, params, allow_stale=False):
+        """Return the cached payload, or None if missing or expired.
+
+        ``allow_stale`` returns expired payloads too, for offline lookups
+        where an old answer beats none.
+        """
+        key = make_key(endpoint, params)
+        now = time.time()
+        ttl = self.ttls.get(endpoint, FALLBACK_TTL)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT payload, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (now - row[1] > ttl and not allow_stale):
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, endpoint, params, payload):
+        key = make_key(endpoint, params)
+        text = json.dumps(payload)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, size, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, text, len(text), now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        # Drop least recently used entries until the cache fits under max_bytes
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+            self.hits = self.misses = 0
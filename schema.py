@@ -0,0 +1,149 @@
+# schema.py
+# Column layout of the movie collection and the single normalization stage
+# that turns raw values (TMDB/OMDb strings, legacy CSV text) into the
+# canonical typed frame: coded lists for Genre/Cast (see compact.py),
+# categorical Director and Language, float ratings and money, nullable
+# integer years. Frames are normalized once, when they are stored or
+# loaded; the tabs treat them as read-only and never re-parse.
+import ast
+import re
+import pandas as pd
+from compact import coded_lists, is_coded
+
+REQUIRED_COLUMNS = [
+    "Title", "Rank", "Year", "Genre", "Director", "Cast",
+    "IMDB Rating", "Rotten Tomatoes", "Metacritic Score", "Awards",
+    "Runtime", "Language", "Overview",
+    "Box Office", "Box Office (Adj)", "Budget", "Budget (Adj)", "Date Added",
+    "Movie ID"
+]
+
+# Stable key for a movie: the IMDb id when known, else the TMDB id, else a
+# slug of the normalized title and year.
+KEY_COLUMN = "Movie ID"
+
+LIST_COLUMNS = ["Genre", "Cast"]
+# Few distinct values repeated across many movies
+CATEGORY_COLUMNS = ["Director", "Language"]
+RATING_COLUMNS = ["IMDB Rating", "Rotten Tomatoes", "Metacritic Score"]
+MONEY_COLUMNS = ["Box Office", "Box Office (Adj)", "Budget", "Budget (Adj)"]
+NUMERIC_COLUMNS = ["Rank", "Year"] + RATING_COLUMNS + MONEY_COLUMNS
+TEXT_COLUMNS = [c for c in REQUIRED_COLUMNS if c not in LIST_COLUMNS + NUMERIC_COLUMNS + CATEGORY_COLUMNS]
+
+
+# Columns of the legacy export format used by final_movie_data.csv
+LEGACY_COLUMN_MAP = {
+    "title": "Title",
+    "year": "Year",
+    "genre_list": "Genre",
+    "director": "Director",
+    "cast_list": "Cast",
+    "rating": "IMDB Rating",
+    "budget": "Budget",
+    "world_wide_gross": "Box Office",
+    "adjusted_budget": "Budget (Adj)",
+    "adjusted_box_office": "Box Office (Adj)",
+    "data_added": "Date Added",
+    "movie_id": "Movie ID",
+}
+
+
+def normalize_title(title):
+    title = re.sub(r"[^\w\s]", " ", str(title).lower())
+    return " ".join(title.split())
+
+
+def fallback_movie_id(title, year):
+    year = "" if pd.isna(year) else str(int(year))
+    return f"title:{normalize_title(title)}:{year}"
+
+
+def parse_list(value):
+    # Accepts real lists, "['a', 'b']" literals and "a, b" comma strings
+    if isinstance(value, list):
+        return value
+    if isinstance(value, tuple) or hasattr(value, "tolist"):
+        return [str(v) for v in list(value)]
+    if not isinstance(value, str):
+        return []
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            return [str(v).strip() for v in ast.literal_eval(value)]
+        except (ValueError, SyntaxError):
+            value = value.strip("[]")
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def parse_numeric(series):
+    # Strips "$", ",", "%" and "/100" suffixes before converting
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype("float64")
+    cleaned = (
+        series.astype("string")
+        .str.replace(r"/\s*100$", "", regex=True)
+        .str.replace(r"[$,%]", "", regex=True)
+        .str.strip()
+    )
+    return pd.to_numeric(cleaned, errors="coerce").astype("float64")
+
+
+def parse_text(series):
+    if pd.api.types.is_string_dtype(series):
+        return series
+    return series.where(series.notna(), None).map(lambda v: v if v is None else str(v))
+
+
+def normalize(df):
+    """Return a copy of df as the canonical typed collection frame.
+
+    Columns that already have their canonical type are passed through, so
+    normalizing a loaded frame again is cheap.
+    """
+    df = df.copy()
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            df[col] = pd.Series([None] * len(df), index=df.index, dtype="object")
+    for col in LIST_COLUMNS:
+        if not is_coded(df[col]):
+            df[col] = coded_lists(df[col].map(parse_list), index=df.index)
+    for col in NUMERIC_COLUMNS:
+        if df[col].dtype != ("Int64" if col == "Year" else "float64"):
+            df[col] = parse_numeric(df[col])
+    df["Year"] = df["Year"].round().astype("Int64")
+    for col in TEXT_COLUMNS:
+        df[col] = parse_text(df[col])
+    for col in CATEGORY_COLUMNS:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = parse_text(df[col]).astype("category")
+    missing_id = df[KEY_COLUMN].isna() | (df[KEY_COLUMN] == "")
+    if missing_id.any():
+        df.loc[missing_id, KEY_COLUMN] = [
+            fallback_movie_id(title, year)
+            for title, year in zip(df.loc[missing_id, "Title"], df.loc[missing_id, "Year"])
+        ]
+    extra_columns = [c for c in df.columns if c not in REQUIRED_COLUMNS]
+    return df[REQUIRED_COLUMNS + extra_columns]
+
+
+def is_legacy_frame(df):
+    return "title_input" in df.columns and "Title" not in df.columns
+
+
+def from_legacy(df):
+    """Convert a frame in the legacy export format to the collection schema."""
+    out = df.rename(columns=LEGACY_COLUMN_MAP)
+    if "runningTimeInMinutes" in df.columns:
+        runtime = pd.to_numeric(df["runningTimeInMinutes"], errors="coerce")
+        out["Runtime"] = runtime.map(lambda m: None if pd.isna(m) else f"{int(m)} min")
+    if "metaScore" in df.columns:
+        # The legacy export stores Metascore divided by 100,000
+        score = pd.to_numeric(df["metaScore"], errors="coerce")
+        out["Metacritic Score"] = (score * 100000).round().where(score < 0.01)
+    if "Oscars_noms" in df.columns:
+        noms = pd.to_numeric(df["Oscars_noms"], errors="coerce").fillna(0).astype(int)
+        out["Awards"] = noms.map(lambda n: f"{n} Oscar nominations" if n else "")
+    if "Date Added" in out.columns:
+        out["Date Added"] = pd.to_datetime(out["Date Added"], format="%m/%d/%y", errors="coerce").dt.strftime("%Y-%m-%d")
+    keep = [c for c in REQUIRED_COLUMNS if c in out.columns]
+    return normalize(out[keep])
@@ -0,0 +1,279 @@
+# similarity.py
+# "More like this": movies described by the people and genres they share.
+# Each movie is a sparse row over features (one per cast member, director
+# and genre), weighted by TF-IDF so a rarely credited actor says more than
+# "Drama", scaled per field, and L2-normalized; the similarity of two
+# movies is the cosine of their rows. A query is one sparse row times the
+# feature-by-movie transpose, so it only touches movies sharing a feature.
+# Each movie's top NEIGHBORS are kept in a neighbor table: filled for the
+# whole collection at build time when it is small, else on first query,
+# and refreshed incrementally when movies are added. Kept free of Streamlit.
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from inverted_index import flatten
+from schema import KEY_COLUMN
+
+# Relative weight of a shared feature of each field, before IDF
+FIELD_WEIGHTS = {"Cast": 1.0, "Director": 1.5, "Genre": 0.5}
+# Neighbors kept per movie
+NEIGHBORS = int(os.environ.get("MOVIEGRAPH_SIMILAR_NEIGHBORS", 20))
+# Collections up to this size get every neighbor list at build time
+PRECOMPUTE_ROWS = int(os.environ.get("MOVIEGRAPH_SIMILAR_PRECOMPUTE", 10_000))
+# Movies added since the build, as a fraction of it, before IDF weights are
+# considered stale and the index is rebuilt
+REBUILD_FRACTION = 0.25
+BLOCK_ROWS = 512
+SEPARATOR = "\x1f"
+
+
+def feature_pairs(df):
+    """Return (keys, codes, rows): row ``rows[i]`` has feature ``keys[codes[i]]``.
+
+    Keys are "<field>\\x1f<value>", so the fields share one column space.
+    """
+    keys, codes, rows, base = [], [], [], 0
+    for field in FIELD_WEIGHTS:
+        values, field_codes, field_rows = flatten(df, field)
+        keys.append(np.array([f"{field}{SEPARATOR}{v}" for v in values], dtype=object))
+        codes.append(field_codes + base)
+        rows.append(field_rows)
+        base += len(values)
+    return np.concatenate(keys), np.concatenate(codes), np.concatenate(rows)
+
+
+def field_weights(keys):
+    return np.array([FIELD_WEIGHTS[key.split(SEPARATOR, 1)[0]] for key in keys], dtype="float64")
+
+
+def idf(doc_freq, n_docs):
+    return np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+
+def incidence(codes, rows, n_rows, n_features):
+    """Binary movie-by-feature matrix (an item listed twice still counts once)."""
+    matrix = sp.csr_matrix((np.ones(len(codes)), (rows, codes)), shape=(n_rows, n_features))
+    matrix.data[:] = 1.0
+    return matrix
+
+
+def weighted_rows(matrix, weights):
+    """Scale columns by ``weights`` and rows to unit length."""
+    matrix = (matrix @ sp.diags(weights)).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sp.diags(1 / np.where(norms > 0, norms, 1)) @ matrix
+    return matrix.astype(np.float32).tocsr()
+
+
+def top_k(scores, k, exclude):
+    """Column positions and values of the ``k`` largest entries of each row of a CSR matrix.
+
+    Column ``exclude[i]`` (the movie itself) is skipped in row ``i``.
+    """
+    positions = np.full((scores.shape[0], k), -1, dtype=np.int32)
+    values = np.zeros((scores.shape[0], k), dtype=np.float32)
+    for i in range(scores.shape[0]):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        row_columns, row_values = scores.indices[start:end], scores.data[start:end]
+        keep = (row_columns != exclude[i]) & (row_values > 0)
+        row_columns, row_values = row_columns[keep], row_values[keep]
+        best = np.argpartition(-row_values, k - 1)[:k] if len(row_values) > k else np.arange(len(row_values))
+        best = best[np.argsort(-row_values[best], kind="stable")]
+        positions[i, :len(best)] = row_columns[best]
+        values[i, :len(best)] = row_values[best]
+    return positions, values
+
+
+class SimilarityIndex:
+    """TF-IDF feature rows of the collection and each movie's nearest neighbors."""
+
+    def __init__(self, ids, keys, weights, matrix, neighbors, scores, computed, built_rows):
+        self.ids = ids  # Movie ID of each row
+        self.keys = keys  # feature of each column
+        self.weights = weights  # field weight times IDF, per column
+        self.matrix = matrix  # CSR, movies by features, rows of unit length
+        self.neighbors = neighbors  # (movies, NEIGHBORS) row positions, -1 past the end
+        self.scores = scores  # cosine of each neighbor
+        self.computed = computed  # rows whose neighbor list is filled
+        self.built_rows = built_rows  # rows the IDF weights were computed from
+        self._transpose = None
+        self._positions = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df, precompute=None):
+        keys, codes, rows = feature_pairs(df)
+        binary = incidence(codes, rows, len(df), len(keys))
+        weights = field_weights(keys) * idf(np.diff(binary.tocsc().indptr), len(df))
+        n = len(df)
+        index = cls(
+            df[KEY_COLUMN].to_numpy(dtype=object), keys, weights, weighted_rows(binary, weights),
+            np.full((n, NEIGHBORS), -1, dtype=np.int32), np.zeros((n, NEIGHBORS), dtype=np.float32),
+            np.zeros(n, dtype=bool), n,
+        )
+        if precompute if precompute is not None else n <= PRECOMPUTE_ROWS:
+            index.fill(np.arange(n))
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        m = self.matrix
+        return (m.data.nbytes + m.indices.nbytes + m.indptr.nbytes + self.weights.nbytes
+                + self.neighbors.nbytes + self.scores.nbytes + self.computed.nbytes)
+
+    def transpose(self):
+        # Feature-by-movie postings; scores of rows R against every movie are R @ transpose
+        if self._transpose is None:
+            self._transpose = self.matrix.T.tocsr()
+        return self._transpose
+
+    def position(self, movie_id):
+        if self._positions is None:
+            self._positions = pd.Index(self.ids)
+        positions = self._positions.get_indexer([movie_id])
+        return int(positions[0]) if positions[0] >= 0 else None
+
+    def fill(self, positions, block_rows=BLOCK_ROWS):
+        """Compute the neighbor lists of rows ``positions`` (in blocks)."""
+        transpose = self.transpose()
+        for start in range(0, len(positions), block_rows):
+            block = positions[start:start + block_rows]
+            scores = (self.matrix[block] @ transpose).tocsr()
+            neighbors, values = top_k(scores, NEIGHBORS, exclude=block)
+            with self._lock:
+                self.neighbors[block], self.scores[block] = neighbors, values
+                self.computed[block] = True
+
+    def similar(self, movie_id, k=10):
+        """Return (Movie IDs, cosine scores) of the ``k`` movies most like ``movie_id``."""
+        position = self.position(movie_id)
+        if position is None:
+            return np.array([], dtype=object), np.array([], dtype=np.float32)
+        if not self.computed[position]:
+            self.fill(np.array([position]))
+        neighbors = self.neighbors[position, :k]
+        found = neighbors >= 0
+        return self.ids[neighbors[found]], self.scores[position, :k][found]
+
+    def shared(self, movie_id, other_ids):
+        """Features each of ``other_ids`` shares with ``movie_id``, as {field: [values]}."""
+        features = set(self.matrix[self.position(movie_id)].indices)
+        out = []
+        for other in other_ids:
+            common = sorted(features.intersection(self.matrix[self.position(other)].indices),
+                            key=lambda c: -self.weights[c])
+            by_field = {}
+            for column in common:
+                field, value = self.keys[column].split(SEPARATOR, 1)
+                by_field.setdefault(field, []).append(value)
+            out.append(by_field)
+        return out
+
+    def features_changed(self, df):
+        """True if any movie of df already in the index has different cast, director or genres."""
+        positions = pd.Index(self.ids).get_indexer(df[KEY_COLUMN])
+        df, positions = df[positions >= 0], positions[positions >= 0]
+        if not len(df):
+            return False
+        keys, codes, rows = feature_pairs(df)
+        columns = pd.Index(self.keys).get_indexer(keys)
+        if (columns[np.unique(codes)] < 0).any():
+            return True
+        current = self.matrix[positions].astype(bool)
+        return (incidence(columns[codes], rows, len(df), len(self.keys)).astype(bool) != current).nnz > 0
+
+    def needs_rebuild(self, op, rows):
+        """True for deletes, edits of cast, director or genres, and additions that shift the IDF weights."""
+        if op == "delete" or (op == "upsert" and self.features_changed(rows)):
+            return True
+        added = int((~rows[KEY_COLUMN].isin(self.ids)).sum())
+        return len(self.ids) + added - self.built_rows > REBUILD_FRACTION * max(self.built_rows, 1)
+
+    def apply(self, op, rows):
+        # Movies already indexed kept their features (see needs_rebuild)
+        return self.add_rows(rows[~rows[KEY_COLUMN].isin(self.ids)])
+
+    def add_rows(self, df):
+        """Return the index with newly added movies, keeping filled neighbor lists exact.
+
+        Existing weights are kept; features first seen in ``df`` get an IDF
+        from their frequency in it. New movies get full neighbor lists, and
+        they enter the filled lists of existing movies they outscore.
+        """
+        if not len(df):
+            return self
+        new_keys, codes, rows = feature_pairs(df)
+        columns = pd.Index(self.keys).get_indexer(new_keys)
+        unseen = columns < 0
+        columns[unseen] = len(self.keys) + np.arange(unseen.sum())
+        keys = np.concatenate([self.keys, new_keys[unseen]])
+        added_binary = incidence(columns[codes], rows, len(df), len(keys))
+        n_old, n = len(self.ids), len(self.ids) + len(df)
+        doc_freq = np.diff(added_binary.tocsc().indptr)[len(self.keys):]
+        weights = np.concatenate([self.weights, field_weights(new_keys[unseen]) * idf(doc_freq, n)])
+        old_matrix = self.matrix.copy()
+        old_matrix.resize((n_old, len(keys)))
+        matrix = sp.vstack([old_matrix, weighted_rows(added_binary, weights)], format="csr")
+
+        index = SimilarityIndex(
+            np.concatenate([self.ids, df[KEY_COLUMN].to_numpy(dtype=object)]), keys, weights, matrix,
+            np.vstack([self.neighbors, np.full((len(df), NEIGHBORS), -1, dtype=np.int32)]),
+            np.vstack([self.scores, np.zeros((len(df), NEIGHBORS), dtype=np.float32)]),
+            np.concatenate([self.computed, np.zeros(len(df), dtype=bool)]), self.built_rows,
+        )
+        new_positions = np.arange(n_old, n)
+        index.fill(new_positions)
+        index.merge_neighbors(new_positions)
+        return index
+
+    def merge_neighbors(self, new_positions):
+        # Cosine is symmetric: a new movie's score against an existing one
+        # is already in the new movie's score row
+        scores = (self.matrix[new_positions] @ self.transpose()).tocoo()
+        targets, sources, values = scores.col, new_positions[scores.row], scores.data
+        keep = (targets < new_positions[0]) & self.computed[targets]
+        targets, sources, values = targets[keep], sources[keep], values[keep]
+        # Only candidates beating the current last neighbor (or filling a short list) matter
+        last = np.where(self.neighbors[targets, -1] >= 0, self.scores[targets, -1], 0)
+        keep = values > last
+        targets, sources, values = targets[keep], sources[keep], values[keep]
+        if not len(targets):
+            return
+        order = np.argsort(targets, kind="stable")
+        targets, sources, values = targets[order], sources[order], values[order]
+        starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(targets)]):
+            target = targets[start]
+            current = self.neighbors[target] >= 0
+            candidates = np.concatenate([self.neighbors[target][current], sources[start:end]])
+            candidate_scores = np.concatenate([self.scores[target][current], values[start:end]])
+            best = np.argsort(-candidate_scores, kind="stable")[:NEIGHBORS]
+            self.neighbors[target] = -1
+            self.scores[target] = 0
+            self.neighbors[target, :len(best)] = candidates[best]
+            self.scores[target, :len(best)] = candidate_scores[best]
+
+    def to_arrays(self):
+        return {
+            "ids": self.ids.astype(str), "keys": self.keys.astype(str),
+            "weights": self.weights, "indptr": self.matrix.indptr, "indices": self.matrix.indices,
+            "data": self.matrix.data, "neighbors": self.neighbors, "scores": self.scores,
+            "computed": self.computed, "built_rows": np.array(self.built_rows),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """The saved index, or None if it was saved with another NEIGHBORS."""
+        if arrays["neighbors"].shape[1] != NEIGHBORS:
+            return None
+        ids, keys = arrays["ids"].astype(object), arrays["keys"].astype(object)
+        matrix = sp.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=(len(ids), len(keys)))
+        return cls(ids, keys, arrays["weights"], matrix, arrays["neighbors"], arrays["scores"],
+                   arrays["computed"], int(arrays["built_rows"]))
@@ -0,0 +1,407 @@
+# storage.py
+# Pluggable storage for the movie collection. The Parquet stores keep the
+# typed schema (coded lists for Genre/Cast, numeric ratings and money) so
+# loading does not have to re-parse text; the CSV store is kept as a
+# fallback for environments without pyarrow.
+#
+# Every store supports whole-collection load/save plus the incremental
+# append / upsert_by_key / delete_where operations. LogStore implements the
+# incremental operations as small append-only segment files that are folded
+# into the base file by periodic compaction, so adding a handful of movies
+# never rewrites the whole collection.
+import os
+import time
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from compact import coded_from_arrow, is_coded
+from schema import REQUIRED_COLUMNS, LIST_COLUMNS, KEY_COLUMN, normalize
+
+# Compact once this many segments have accumulated since the last compaction
+COMPACT_EVERY = int(os.environ.get("MOVIEGRAPH_COMPACT_EVERY", 32))
+# A store lock older than this is assumed to belong to a dead process
+STALE_LOCK_SECONDS = 120
+LOCK_POLL_SECONDS = 0.005
+
+OP_COLUMN = "_op"
+COMPACTED_THROUGH_KEY = b"moviegraph.compacted_through"
+
+
+def atomic_write(path, write):
+    # Write to a temporary sibling and rename over the target, so readers
+    # never see a half-written file.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_arrays(path, version, arrays):
+    """Persist derived data (a dict of arrays) computed from ``version`` of the collection."""
+    arrays = {**arrays, "version": np.array(version)}
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+    atomic_write(path, write)
+
+
+def load_arrays(path):
+    """Return (arrays, version) as written by save_arrays, or (None, None) if nothing is saved."""
+    if not os.path.exists(path):
+        return None, None
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    return arrays, str(arrays.pop("version"))
+
+
+def empty_frame():
+    return normalize(pd.DataFrame(columns=REQUIRED_COLUMNS))
+
+
+def frame_from_arrow(table):
+    # List columns load straight into the compact layout (see compact.py),
+    # without a Python list per row; files written before it hold plain
+    # string lists and are dictionary-encoded here
+    import pyarrow as pa
+
+    df = table.to_pandas(types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_list(t) else None)
+    for col in LIST_COLUMNS:
+        if col in df.columns and not is_coded(df[col]):
+            df[col] = coded_from_arrow(table.column(col))
+    return df
+
+
+def read_parquet(path):
+    import pyarrow.parquet as pq
+
+    return frame_from_arrow(pq.read_table(path))
+
+
+def lists_as_text(df):
+    # CSV has no list type: lists are written as Python literals, which
+    # schema.parse_list reads back
+    df = df.copy()
+    for col in LIST_COLUMNS:
+        df[col] = [str(list(v)) for v in df[col]]
+    return df
+
+
+def drop_keys(df, keys):
+    return df[~df[KEY_COLUMN].isin(keys)]
+
+
+class CsvStore:
+    suffix = ".csv"
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        if not self.exists():
+            return empty_frame()
+        return normalize(pd.read_csv(self.path))
+
+    def save(self, df):
+        atomic_write(self.path, lambda tmp: lists_as_text(normalize(df)).to_csv(tmp, index=False))
+
+    def clear(self):
+        if self.exists():
+            os.remove(self.path)
+
+    def version(self):
+        """Token that changes whenever the stored collection changes."""
+        if not self.exists():
+            return ""
+        stat = os.stat(self.path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def changes_since(self, version):
+        """List of (op, rows) changes made after ``version``.
+
+        Returns None when the changes cannot be replayed and derived data
+        has to be rebuilt from a full load.
+        """
+        return [] if version == self.version() else None
+
+    # Snapshot stores implement the incremental API as read-modify-write
+    def append(self, df):
+        self.save(pd.concat([self.load(), normalize(df)], ignore_index=True))
+
+    def upsert_by_key(self, df):
+        """Insert rows, replacing existing rows that share their Movie ID."""
+        df = normalize(df).drop_duplicates(KEY_COLUMN, keep="last")
+        self.save(pd.concat([drop_keys(self.load(), df[KEY_COLUMN]), df], ignore_index=True))
+
+    def delete_where(self, predicate):
+        """Delete rows for which ``predicate(df)`` is True; returns the count."""
+        existing = self.load()
+        mask = predicate(existing).fillna(False).astype(bool)
+        if mask.any():
+            self.save(existing[~mask])
+        return int(mask.sum())
+
+    def rewrite(self, transform):
+        """Replace the whole collection with ``transform(df)`` in one write."""
+        self.save(transform(self.load()))
+
+
+class ParquetStore(CsvStore):
+    suffix = ".parquet"
+
+    def load(self):
+        if not self.exists():
+            return empty_frame()
+        return normalize(read_parquet(self.path))
+
+    def save(self, df):
+        atomic_write(self.path, lambda tmp: normalize(df).to_parquet(tmp, index=False))
+
+
+class LogStore(ParquetStore):
+    """Parquet base file plus an append-only log of change segments.
+
+    Each append/upsert/delete writes one segment into ``<path>.log/``; segment
+    names sort by creation time, so the log replays in write order. The base
+    file records the last segment folded into it, which lets readers skip
+    segments that compaction has already applied. Compaction leaves the
+    folded segments in place until the next compaction, so a reader holding
+    the previous base still finds every segment it needs.
+
+    Writers hold the store lock from picking a segment name until the
+    segment is in place, and compaction holds it while it lists and folds
+    the log, so a segment can never land behind the recorded high-water
+    mark and be skipped.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.log_dir = path + ".log"
+        self.lock_path = path + ".lock"
+
+    def exists(self):
+        return os.path.exists(self.path) or bool(self._segments())
+
+    def _segments(self, after=""):
+        if not os.path.isdir(self.log_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.log_dir)
+            if name.endswith(".parquet") and name > after
+        )
+
+    def _read_base(self):
+        import pyarrow.parquet as pq
+
+        if not os.path.exists(self.path):
+            return empty_frame(), ""
+        table = pq.read_table(self.path)
+        metadata = table.schema.metadata or {}
+        compacted_through = metadata.get(COMPACTED_THROUGH_KEY, b"").decode()
+        return frame_from_arrow(table), compacted_through
+
+    def _compacted_through(self):
+        import pyarrow.parquet as pq
+
+        if not os.path.exists(self.path):
+            return ""
+        metadata = pq.read_schema(self.path).metadata or {}
+        return metadata.get(COMPACTED_THROUGH_KEY, b"").decode()
+
+    def _write_base(self, df, compacted_through):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(normalize(df), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[COMPACTED_THROUGH_KEY] = compacted_through.encode()
+        table = table.replace_schema_metadata(metadata)
+        atomic_write(self.path, lambda tmp: pq.write_table(table, tmp))
+
+    def _read_segment(self, name):
+        segment = read_parquet(os.path.join(self.log_dir, name))
+        return segment[OP_COLUMN].iloc[0], segment.drop(columns=OP_COLUMN)
+
+    def _replay(self):
+        df, compacted_through = self._read_base()
+        segments = self._segments(after=compacted_through)
+        for name in segments:
+            op, rows = self._read_segment(name)
+            if op in ("upsert", "delete"):
+                df = drop_keys(df, rows[KEY_COLUMN])
+            if op in ("append", "upsert"):
+                df = pd.concat([df, rows], ignore_index=True)
+        return df.reset_index(drop=True), segments
+
+    def load(self):
+        try:
+            return normalize(self._replay()[0])
+        except FileNotFoundError:
+            # A concurrent compaction swapped files underneath us; retry once
+            return normalize(self._replay()[0])
+
+    def version(self):
+        # Segment names and save generations both sort by time, so the
+        # newest of them identifies the current contents.
+        segments = self._segments()
+        return max(self._compacted_through(), segments[-1] if segments else "")
+
+    def changes_since(self, version):
+        compacted_through = self._compacted_through()
+        if version < compacted_through or version > self.version():
+            # Compacted, rewritten or cleared since; the segments may be gone
+            return None
+        try:
+            return [self._read_segment(name) for name in self._segments(after=version)]
+        except FileNotFoundError:
+            return None
+
+    def _new_name(self):
+        return f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet"
+
+    def _write_segment(self, op, df):
+        os.makedirs(self.log_dir, exist_ok=True)
+        df = df.copy()
+        df[OP_COLUMN] = op
+        with self._locked():
+            name = self._new_name()
+            atomic_write(os.path.join(self.log_dir, name), lambda tmp: df.to_parquet(tmp, index=False))
+        self.maybe_compact()
+
+    def append(self, df):
+        if len(df):
+            self._write_segment("append", normalize(df))
+
+    def upsert_by_key(self, df):
+        """Insert rows, replacing existing rows that share their Movie ID."""
+        if len(df):
+            df = normalize(df).drop_duplicates(KEY_COLUMN, keep="last")
+            self._write_segment("upsert", df)
+
+    def delete_where(self, predicate):
+        """Delete rows for which ``predicate(df)`` is True; returns the count."""
+        existing = self.load()
+        mask = predicate(existing).fillna(False).astype(bool)
+        if mask.any():
+            self._write_segment("delete", existing.loc[mask, [KEY_COLUMN]])
+        return int(mask.sum())
+
+    def save(self, df):
+        # A full rewrite supersedes every segment written so far; it gets a
+        # fresh generation name so version() changes even without segments.
+        with self._locked():
+            self._write_base(df, self._new_name())
+
+    def rewrite(self, transform):
+        """Replace the whole collection with ``transform(df)`` in one write.
+
+        The lock is held from the read to the write, so a commit cannot land
+        in between and be overwritten; the result is a new base, like save(),
+        rather than a log segment the size of the collection.
+        """
+        with self._locked():
+            self._write_base(transform(normalize(self._replay()[0])), self._new_name())
+
+    def clear(self):
+        # An empty base under a fresh generation name rather than no files:
+        # versions from before the clear then fall below compacted_through,
+        # so changes_since() reports them unreplayable and derived data
+        # (index, cubes) is rebuilt instead of replaying later segments
+        # onto cleared movies.
+        with self._locked():
+            self._write_base(empty_frame(), self._new_name())
+            for name in self._segments():
+                os.remove(os.path.join(self.log_dir, name))
+
+    def _acquire_lock(self):
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(self.lock_path) < STALE_LOCK_SECONDS:
+                    return False
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+            return self._acquire_lock()
+        os.close(fd)
+        return True
+
+    @contextmanager
+    def _locked(self):
+        # Blocking form of _acquire_lock, for writers
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        while not self._acquire_lock():
+            time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            os.remove(self.lock_path)
+
+    def maybe_compact(self):
+        if len(self._segments(after=self._compacted_through())) >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Fold pending segments into the base file.
+
+        Returns False when the store is locked (another compaction or a
+        write in progress); the next write tries again.
+        """
+        if not self._acquire_lock():
+            return False
+        try:
+            previous = self._compacted_through()
+            df, applied = self._replay()
+            if applied:
+                self._write_base(df, applied[-1])
+            # Segments folded by the previous compaction are no longer needed
+            for name in self._segments():
+                if name <= previous:
+                    os.remove(os.path.join(self.log_dir, name))
+        finally:
+            os.remove(self.lock_path)
+        return True
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_store(base_path, backend=None):
+    """Return the store for ``base_path`` (path without extension).
+
+    ``backend`` is "log", "parquet" or "csv"; by default the log-structured
+    Parquet store is used when pyarrow is installed.
+    """
+    if backend is None:
+        backend = "log" if parquet_available() else "csv"
+    store_class = {"log": LogStore, "parquet": ParquetStore, "csv": CsvStore}[backend]
+    return store_class(base_path + store_class.suffix)
+
+
+def migrate_csv(csv_path, store):
+    """One-time copy of a legacy CSV collection into ``store``.
+
+    The CSV is kept next to the new file with a ``.migrated`` suffix.
+    Returns True if a migration happened.
+    """
+    if store.exists() or not os.path.exists(csv_path) or csv_path == store.path:
+        return False
+    store.save(pd.read_csv(csv_path))
+    os.replace(csv_path, csv_path + ".migrated")
+    return True
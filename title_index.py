@@ -0,0 +1,115 @@
+# title_index.py
+# Local title -> Movie ID resolution, so known titles skip the TMDB search
+# round trip and titles already in the collection are caught before any
+# network I/O. Titles are matched on their normalized form (case and
+# punctuation folded) and then fuzzily with rapidfuzz. Entries come from the
+# collection itself and from the reference export (final_movie_data.csv),
+# whose title_input column records what was typed to find each movie.
+import re
+from collections import namedtuple
+
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from schema import KEY_COLUMN, normalize_title
+
+# Fuzzy matches must score at least this (rapidfuzz ratio, 0-100). High
+# enough that "Alien" does not match "Aliens" but "Titanc" finds "Titanic".
+FUZZY_CUTOFF = 92
+# Shorter titles only match exactly; one typo there is a different word
+FUZZY_MIN_LENGTH = 6
+
+Match = namedtuple("Match", ["movie_id", "title", "score", "in_collection"])
+
+
+def title_numbers(key):
+    # Sequel numbers and years must agree: "Rocky 2" is not "Rocky 3"
+    return re.findall(r"\d+", key)
+
+
+class TitleIndex:
+    def __init__(self, entries, collection_ids):
+        self.entries = entries  # normalized title -> {movie_id: title}
+        self.collection_ids = collection_ids
+        self.keys = list(entries)
+
+    @classmethod
+    def build(cls, collection=None, reference=None):
+        """Index the collection frame and the reference export, if given."""
+        entries = {}
+
+        def add(keys, ids, titles):
+            for key, movie_id, title in zip(keys, ids, titles):
+                if key and isinstance(movie_id, str) and movie_id:
+                    entries.setdefault(key, {}).setdefault(movie_id, title)
+
+        collection_ids = set()
+        if collection is not None and len(collection):
+            ids = collection[KEY_COLUMN].tolist()
+            titles = collection["Title"].tolist()
+            add([normalize_title(t) if isinstance(t, str) else "" for t in titles], ids, titles)
+            collection_ids = set(ids)
+        if reference is not None and len(reference):
+            ids = reference["movie_id"].tolist()
+            titles = reference["title"].tolist()
+            keys = [normalize_title(t) if isinstance(t, str) else "" for t in titles]
+            add(keys, ids, titles)
+            # Typed titles are aliases, unless they name a different sequel
+            aliases = [normalize_title(t) if isinstance(t, str) else "" for t in reference["title_input"]]
+            consistent = [title_numbers(a) == title_numbers(k) for a, k in zip(aliases, keys)]
+            add([a if ok else "" for a, ok in zip(aliases, consistent)], ids, titles)
+        return cls(entries, collection_ids)
+
+    def copy(self):
+        return TitleIndex({key: dict(movies) for key, movies in self.entries.items()}, set(self.collection_ids))
+
+    def add_movies(self, ids, titles):
+        """Register movies just committed to the collection."""
+        for movie_id, title in zip(ids, titles):
+            key = normalize_title(title) if isinstance(title, str) else ""
+            if key and isinstance(movie_id, str) and movie_id:
+                if key not in self.entries:
+                    self.keys.append(key)
+                self.entries.setdefault(key, {}).setdefault(movie_id, title)
+            self.collection_ids.add(movie_id)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _pick(self, key, score):
+        candidates = self.entries[key]
+        owned = [m for m in candidates if m in self.collection_ids]
+        if owned:
+            movie_id = owned[0]
+        elif len(candidates) == 1:
+            movie_id = next(iter(candidates))
+        else:
+            return None  # several films share this title; let TMDB decide
+        return Match(movie_id, candidates[movie_id], score, movie_id in self.collection_ids)
+
+    def resolve(self, title):
+        """Return the Match for ``title``, or None if it is unknown or ambiguous."""
+        key = normalize_title(title)
+        if not key:
+            return None
+        if key in self.entries:
+            return self._pick(key, 100.0)
+        if len(key) < FUZZY_MIN_LENGTH or not self.keys:
+            return None
+        best = process.extract(key, self.keys, scorer=fuzz.ratio, score_cutoff=FUZZY_CUTOFF, limit=2)
+        if not best:
+            return None
+        (match, score, _), rest = best[0], best[1:]
+        if rest and rest[0][1] == score:
+            return None
+        if title_numbers(match) != title_numbers(key):
+            return None
+        return self._pick(match, score)
+
+
+def read_reference(path):
+    """Load the title columns of the reference export, or None if it is missing."""
+    try:
+        return pd.read_csv(path, usecols=["title", "title_input", "movie_id"], dtype=str)
+    except (FileNotFoundError, ValueError):
+        return None
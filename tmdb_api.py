@@ -1,33 +1,97 @@
 # tmdb_api.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-import streamlit as st
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
-OMDB_BASE_URL = "http://www.omdbapi.com/"
-
-TMDB_API_KEY = st.secrets["TMDB_API_KEY"]
-OMDB_API_KEY = st.secrets.get("OMDB_API_KEY", "")
-
-# U.S. CPI adjustment factor approximation (2024 dollars)
-INFLATION_FACTORS = {year: 1 + 0.03 * (2024 - year) for year in range(1950, 2025)}
-
-def adjust_for_inflation(amount, year):
+from response_cache import ResponseCache, OfflineCacheMiss
+from http_scheduler import Scheduler, RequestStats, track, current_stats
+import perf
+
+# Base URLs can be pointed at a local stub server (see tools/stub_server.py)
+TMDB_BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+OMDB_BASE_URL = os.environ.get("OMDB_BASE_URL", "http://www.omdbapi.com/")
+
+# Number of titles fetched in parallel by fetch_movies_batch
+MAX_CONCURRENCY = int(os.environ.get("MOVIEGRAPH_MAX_CONCURRENCY", 8))
+# Import jobs run at once (see jobs.py), each fetching up to MAX_CONCURRENCY titles
+MAX_IMPORT_JOBS = int(os.environ.get("MOVIEGRAPH_IMPORT_JOBS", 2))
+
+# Offline mode serves lookups from the response cache only
+OFFLINE_MODE = os.environ.get("MOVIEGRAPH_OFFLINE", "") == "1"
+
+_api_keys = None
+
+_session = None
+_session_lock = threading.Lock()
+
+response_cache = ResponseCache()
+scheduler = Scheduler()
+
+def api_keys():
+    """Return (TMDB key, OMDb key) from the environment, else Streamlit's secrets.
+
+    Read on first use, so importing this module needs neither the keys nor
+    Streamlit; headless runs (cli.py, workers) set TMDB_API_KEY and
+    OMDB_API_KEY in the environment.
+    """
+    global _api_keys
+    if _api_keys is None:
+        tmdb_key = os.environ.get("TMDB_API_KEY")
+        omdb_key = os.environ.get("OMDB_API_KEY")
+        if tmdb_key is None:
+            import streamlit as st
+            tmdb_key = st.secrets["TMDB_API_KEY"]
+            omdb_key = omdb_key if omdb_key is not None else st.secrets.get("OMDB_API_KEY", "")
+        _api_keys = (tmdb_key, omdb_key or "")
+    return _api_keys
+
+def get_session():
+    # One keep-alive session shared by all worker threads; the adapter pool is
+    # sized so every concurrent fetch of every import job gets its own pooled
+    # connection per host.
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_CONCURRENCY * MAX_IMPORT_JOBS, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+def get_json(endpoint, url, params, offline=None):
+    # Cached GET: fresh cache entries never touch the network; offline,
+    # expired ones are served too
+    offline = OFFLINE_MODE if offline is None else offline
+    key_params = {"url": url, **params}
+    cached = response_cache.get(endpoint, key_params, allow_stale=offline)
+    if cached is not None:
+        return cached
+    if offline:
+        raise OfflineCacheMiss(f"{endpoint} not cached: {url}")
+    provider = "omdb" if endpoint == "omdb" else "tmdb"
+    current_stats().calls += 1
+    with perf.span(f"http {endpoint}") as span:
+        resp = scheduler.get(provider, get_session(), url, params)
+        span.record(nbytes=len(resp.content))
+    payload = resp.json()
+    if resp.ok:
+        response_cache.set(endpoint, key_params, payload)
+    return payload
+
+def get_omdb_data(title, year=None, offline=None, imdb_id=None):
     try:
-        year = int(str(year)[:4])
-        amount = int(amount)
-        factor = INFLATION_FACTORS.get(year, 1.0)
-        return int(amount * factor)
-    except:
-        return ""
-
-def get_omdb_data(title, year=None):
-    try:
-        params = {"t": title, "apikey": OMDB_API_KEY}
-        if year:
-            params["y"] = year
+        # By IMDb id when known, so OMDb rates the same film TMDB found
+        if imdb_id:
+            params = {"i": imdb_id, "apikey": api_keys()[1]}
+        else:
+            params = {"t": title, "apikey": api_keys()[1]}
+            if year:
+                params["y"] = year
 
-        response = requests.get(OMDB_BASE_URL, params=params).json()
+        response = get_json("omdb", OMDB_BASE_URL, params, offline)
 
         metascore = ""
         rt_score = ""
@@ -46,31 +110,51 @@ def get_omdb_data(title, year=None):
             "IMDB Rating": imdb_rating,
             "Awards": awards
         }
+    except OfflineCacheMiss:
+        return {}
     except Exception as e:
-        st.write("❌ OMDb error:", e)
+        # Ratings are optional; the title is still added, with a warning
+        current_stats().warnings.append(f"OMDb: {e}")
         return {}
 
-def fetch_movie_data(title):
-    search_url = f"{TMDB_BASE_URL}/search/movie"
-    search_resp = requests.get(search_url, params={
-        "api_key": TMDB_API_KEY,
-        "query": title
-    }).json()
-
-    results = search_resp.get("results", [])
-    if not results:
-        return None
-
-    movie = results[0]
-    movie_id = movie["id"]
-
-    detail = requests.get(f"{TMDB_BASE_URL}/movie/{movie_id}", params={
-        "api_key": TMDB_API_KEY
-    }).json()
-
-    credits = requests.get(f"{TMDB_BASE_URL}/movie/{movie_id}/credits", params={
-        "api_key": TMDB_API_KEY
-    }).json()
+def tmdb_lookup_id(movie_id):
+    # TMDB's movie endpoints accept IMDb ids as well as their own
+    if isinstance(movie_id, str) and movie_id.startswith("tt"):
+        return movie_id
+    if isinstance(movie_id, str) and movie_id.startswith("tmdb:"):
+        return movie_id[len("tmdb:"):]
+    return None
+
+def fetch_movie_data(title, offline=None, movie_id=None):
+    """Fetch one movie in at most three calls: search, detail with credits, OMDb.
+
+    A known ``movie_id`` (see title_index) skips the search, and fresh
+    cached responses skip their call entirely. The inflation-adjusted
+    money columns are left out; the backend computes them from the CPI
+    table when the movie is stored (see inflation.py).
+    """
+    lookup_id = tmdb_lookup_id(movie_id)
+    if lookup_id is None:
+        search_url = f"{TMDB_BASE_URL}/search/movie"
+        search_resp = get_json("tmdb_search", search_url, {
+            "api_key": api_keys()[0],
+            "query": title
+        }, offline)
+
+        results = search_resp.get("results", [])
+        if not results:
+            return None
+        lookup_id = results[0]["id"]
+
+    detail = get_json("tmdb_movie", f"{TMDB_BASE_URL}/movie/{lookup_id}", {
+        "api_key": api_keys()[0],
+        "append_to_response": "credits"
+    }, offline)
+    if "id" not in detail:
+        # A stale local id; fall back to searching by title
+        return fetch_movie_data(title, offline) if movie_id is not None else None
+    movie_id = detail["id"]
+    credits = detail.get("credits", {})
 
     director = next((c["name"] for c in credits.get("crew", []) if c.get("job") == "Director"), "")
     cast_list = [c["name"] for c in credits.get("cast", [])][:10]
@@ -79,10 +163,8 @@ def fetch_movie_data(title):
     year = detail.get("release_date", "")[:4]
     box_office = detail.get("revenue", 0)
     budget = detail.get("budget", 0)
-    adj_box_office = adjust_for_inflation(box_office, year)
-    adj_budget = adjust_for_inflation(budget, year)
 
-    omdb = get_omdb_data(title, year)
+    omdb = get_omdb_data(title, year, offline, detail.get("imdb_id"))
 
     return {
         "Title": detail.get("title"),
@@ -98,7 +180,65 @@ def fetch_movie_data(title):
         "Language": detail.get("original_language", "").upper(),
         "Overview": detail.get("overview", ""),
         "Box Office": box_office,
-        "Box Office (Adj)": adj_box_office,
         "Budget": budget,
-        "Budget (Adj)": adj_budget
+        "Movie ID": detail.get("imdb_id") or f"tmdb:{movie_id}"
     }
+
+class FetchOutcome:
+    """What happened to one title in fetch_movies_report."""
+
+    def __init__(self, title, status, data=None, error=None, stats=None):
+        self.title = title
+        self.status = status  # "found", "not_found", "not_cached" or "failed"
+        self.data = data
+        self.error = error
+        self.stats = stats or RequestStats()
+
+    def as_dict(self):
+        return {
+            "Title": self.title,
+            "Status": self.status,
+            "Calls": self.stats.calls,
+            "Requests": self.stats.requests,
+            "Retries": self.stats.retries,
+            "Throttled (s)": round(self.stats.waited, 2),
+            "Error": self.error or "; ".join(self.stats.warnings),
+        }
+
+def fetch_outcome(title, offline=None, movie_id=None):
+    stats = RequestStats()
+    with track(stats):
+        try:
+            data = fetch_movie_data(title, offline, movie_id)
+            return FetchOutcome(title, "found" if data else "not_found", data, stats=stats)
+        except OfflineCacheMiss:
+            return FetchOutcome(title, "not_cached", stats=stats)
+        except Exception as e:
+            return FetchOutcome(title, "failed", error=str(e), stats=stats)
+
+def fetch_movies_report(titles, max_workers=None, on_progress=None, offline=None, movie_ids=None):
+    """Fetch metadata for many titles concurrently.
+
+    Returns one FetchOutcome per title, in input order. ``movie_ids``
+    optionally gives a locally resolved id (or None) per title.
+    ``on_progress(done, total)`` is called from the calling thread as each
+    title finishes, so it is safe to update Streamlit widgets from it.
+    """
+    titles = list(titles)
+    movie_ids = list(movie_ids) if movie_ids is not None else [None] * len(titles)
+    outcomes = [None] * len(titles)
+    if not titles:
+        return outcomes
+
+    workers = max(1, min(max_workers or MAX_CONCURRENCY, len(titles)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_outcome, title, offline, movie_ids[i]): i for i, title in enumerate(titles)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            outcomes[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(titles))
+    return outcomes
+
+def fetch_movies_batch(titles, max_workers=None, on_progress=None, offline=None, movie_ids=None):
+    """Like fetch_movies_report, but only the data (None when not found or failed)."""
+    return [o.data for o in fetch_movies_report(titles, max_workers, on_progress, offline, movie_ids)]
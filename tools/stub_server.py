@@ -0,0 +1,167 @@
+# tools/stub_server.py
+# Local stand-in for the TMDB and OMDb APIs, for exercising the fetch code
+# without network access or API keys.
+#
+#   python tools/stub_server.py --port 8765 --latency 0.05
+#   TMDB_BASE_URL=http://127.0.0.1:8765/3 OMDB_BASE_URL=http://127.0.0.1:8765/omdb/ streamlit run app.py
+#
+# Every title resolves to a deterministic fake movie, except titles that
+# start with "missing", which return no search results.
+#
+# Faults can be injected to exercise the client's rate limiting and
+# retries: --error-rate answers that fraction of requests with a 429,
+# --max-rps answers 429 once more requests than that arrive within a
+# second (counted separately for TMDB and OMDb), and --retry-after adds a Retry-After header to those 429s.
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+GENRES = ["Drama", "Comedy", "Action", "Thriller", "Romance", "Horror", "Sci-Fi", "Animation"]
+
+
+def movie_id_for(title):
+    return zlib.crc32(title.strip().lower().encode("utf-8")) % 900000 + 1000
+
+
+def fake_detail(movie_id):
+    return {
+        "id": movie_id,
+        "imdb_id": f"tt{movie_id:07d}",
+        "title": f"Movie {movie_id}",
+        "release_date": f"{1950 + movie_id % 75}-01-01",
+        "genres": [{"name": GENRES[movie_id % len(GENRES)]}, {"name": GENRES[(movie_id // 7) % len(GENRES)]}],
+        "runtime": 80 + movie_id % 90,
+        "original_language": "en",
+        "overview": f"Overview for movie {movie_id}.",
+        "revenue": (movie_id % 500) * 1_000_000,
+        "budget": (movie_id % 200) * 1_000_000,
+        "vote_average": round(5 + (movie_id % 50) / 10, 1),
+    }
+
+
+def fake_credits(movie_id):
+    return {
+        "id": movie_id,
+        "cast": [{"name": f"Actor {(movie_id + i) % 5000}"} for i in range(15)],
+        "crew": [{"name": f"Director {movie_id % 300}", "job": "Director"}],
+    }
+
+
+def fake_omdb(movie_id):
+    return {
+        "Response": "True",
+        "imdbID": f"tt{movie_id:07d}",
+        "imdbRating": str(round(5 + (movie_id % 50) / 10, 1)),
+        "Awards": "N/A",
+        "Ratings": [
+            {"Source": "Rotten Tomatoes", "Value": f"{movie_id % 101}%"},
+            {"Source": "Metacritic", "Value": f"{movie_id % 100}/100"},
+        ],
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    max_rps = None
+    retry_after = None
+    request_count = 0
+    throttled_count = 0
+    count_lock = threading.Lock()
+    recent = {}  # API -> arrival times within the last second, for max_rps
+    rng = random.Random(0)
+
+    def throttled(self, api):
+        with StubHandler.count_lock:
+            now = time.monotonic()
+            if self.max_rps:
+                recent = [t for t in StubHandler.recent.get(api, []) if now - t < 1.0] + [now]
+                StubHandler.recent[api] = recent
+                if len(recent) > self.max_rps:
+                    StubHandler.throttled_count += 1
+                    return True
+            if self.error_rate and StubHandler.rng.random() < self.error_rate:
+                StubHandler.throttled_count += 1
+                return True
+            return False
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with StubHandler.count_lock:
+            StubHandler.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+
+        if self.throttled(parts[0] if parts else ""):
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+            return self.send_json({"status_message": "rate limited"}, status=429, headers=headers)
+
+        if parts[:1] == ["omdb"]:
+            if params.get("i", "").startswith("tt"):
+                return self.send_json(fake_omdb(int(params["i"][2:])))
+            return self.send_json(fake_omdb(movie_id_for(params.get("t", ""))))
+
+        if parts[:3] == ["3", "search", "movie"]:
+            query = params.get("query", "")
+            if query.lower().startswith("missing"):
+                return self.send_json({"results": []})
+            return self.send_json({"results": [{"id": movie_id_for(query), "title": query}]})
+
+        if parts[:2] == ["3", "movie"] and len(parts) >= 3:
+            # Like TMDB, movie endpoints also take an IMDb id
+            movie_id = int(parts[2][2:] if parts[2].startswith("tt") else parts[2])
+            if len(parts) == 4 and parts[3] == "credits":
+                return self.send_json(fake_credits(movie_id))
+            detail = fake_detail(movie_id)
+            if "credits" in params.get("append_to_response", "").split(","):
+                detail["credits"] = fake_credits(movie_id)
+            return self.send_json(detail)
+
+        self.send_json({"status_message": "not found"}, status=404)
+
+
+def serve(port=0, latency=0.0, error_rate=0.0, max_rps=None, retry_after=None):
+    """Start the stub server on a background thread and return it."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "latency": latency, "error_rate": error_rate, "max_rps": max_rps, "retry_after": retry_after,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local TMDB/OMDb stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of delay added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 429")
+    parser.add_argument("--max-rps", type=int, default=None, help="answer 429 above this many requests per second")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+    server = serve(args.port, args.latency, args.error_rate, args.max_rps, args.retry_after)
+    print(f"Stub TMDB at http://127.0.0.1:{args.port}/3, OMDb at http://127.0.0.1:{args.port}/omdb/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,78 +1,97 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from tmdb_api import fetch_movie_data
-from backend import load_data, save_data
-import os
-
-BACKEND_PATH = "data/backend_movie_data.csv"
+from backend import load_data, load_title_index, upsert_movies, delete_movies_where, record_rankings, rank_history
+from importer import check_columns
+from jobs import submit_csv
+from import_panel import jobs_panel
+from rankings import rank_changes
+from schema import KEY_COLUMN
+import perf
 
 def top_100_tab():
     st.subheader("📥 Upload Your Top 100 Movies")
 
     uploaded_file = st.file_uploader("Upload CSV with 'Rank' and 'Title' columns", type="csv")
     if uploaded_file:
-        df_uploaded = pd.read_csv(uploaded_file)
-        if "Rank" not in df_uploaded.columns or "Title" not in df_uploaded.columns:
-            st.error("CSV must contain 'Rank' and 'Title' columns.")
+        data = uploaded_file.getvalue()
+        error = check_columns(data, ranked=True)
+        if error:
+            st.error(error)
             return
 
-        with st.spinner("Fetching movie metadata..."):
-            progress_bar = st.progress(0)
-            movie_data = []
-            for i, row in df_uploaded.iterrows():
-                data = fetch_movie_data(row["Title"])
-                if data:
-                    data["Rank"] = row["Rank"]
-                    data["Date Added"] = datetime.now().strftime("%Y-%m-%d")
-                    movie_data.append(data)
-                progress_bar.progress((i + 1) / len(df_uploaded))
-
-        if movie_data:
-            existing_df = load_data()
-
-            # Remove all currently ranked movies
-            non_ranked_df = existing_df[existing_df["Rank"].isna()] if "Rank" in existing_df.columns else existing_df
+        # Imported in the background, once per upload rather than on every
+        # rerun; re-uploading an interrupted file resumes it
+        if st.session_state.get("top100_upload") != uploaded_file.file_id:
+            submit_csv(data, uploaded_file.name, ranked=True)
+            st.session_state["top100_upload"] = uploaded_file.file_id
 
-            df_new = pd.DataFrame(movie_data)
-            updated_df = pd.concat([non_ranked_df, df_new], ignore_index=True)
-            save_data(updated_df)
-            st.success("✅ Top 100 movies added successfully!")
+    jobs_panel(["ranked"])
 
     st.subheader("🎬 Current Top 100")
 
-    df = load_data()
+    with perf.span("load data") as span:
+        df = load_data()
+        span.record(df)
     if "Rank" in df.columns:
-        df_top100 = df[df["Rank"].notna()].copy()
-        df_top100["Rank"] = pd.to_numeric(df_top100["Rank"], errors="coerce")
-        df_top100 = df_top100.sort_values("Rank")
+        with perf.span("select ranked") as span:
+            df_top100 = df[df["Rank"].notna()].copy()
+            df_top100["Rank"] = pd.to_numeric(df_top100["Rank"], errors="coerce")
+            df_top100 = df_top100.sort_values("Rank")
+            span.record(df_top100)
 
         display_cols = [
             "Rank", "Title", "Year", "Genre", "Director", "Cast",
             "IMDB Rating", "Rotten Tomatoes", "Metacritic Score",
-            "Box Office", "Budget", "Date Added"
+            "Box Office", "Budget", "Date Added", KEY_COLUMN
         ]
         display_cols = [col for col in display_cols if col in df_top100.columns]
 
         if not df_top100.empty:
             st.caption("⬆️ Drag rows to reorder your rankings. Edit Rank or Title if needed.")
-            new_order = st.data_editor(
-                df_top100[display_cols],
-                use_container_width=True,
-                num_rows="dynamic",
-                key="top100_editor"
-            )
+            with perf.span("rank editor") as span:
+                span.record(df_top100)
+                new_order = st.data_editor(
+                    df_top100[display_cols],
+                    use_container_width=True,
+                    num_rows="dynamic",
+                    disabled=[KEY_COLUMN],
+                    key="top100_editor"
+                )
 
             if st.button("💾 Save Updated Rankings"):
-                df_updated = df.copy()
-                for _, row in new_order.iterrows():
-                    df_updated.loc[df_updated["Title"] == row["Title"], "Rank"] = row["Rank"]
-                save_data(df_updated)
-                st.success("✅ Rankings updated!")
+                with perf.span("save rankings") as span:
+                    # Keyed by Movie ID; rows with an edited or new Title are
+                    # matched to the collection by title
+                    changed, unmatched = rank_changes(df, new_order, load_title_index(df))
+                    span.record(changed)
+                    if len(changed):
+                        upsert_movies(changed)
+                        record_rankings("editor")
+                if unmatched:
+                    st.warning(f"No single movie in the collection matches: {', '.join(unmatched)}")
+                st.success(f"✅ Rankings updated! ({len(changed)} changed)")
+
+    rank_history_panel()
 
     if st.button("🗑️ Clear All Top 100 Data"):
-        df = load_data()
-        if "Rank" in df.columns:
-            df = df[df["Rank"].isna()]  # Keep only unranked entries
-        save_data(df)
+        delete_movies_where(lambda df: df["Rank"].notna())  # Keep only unranked entries
+        record_rankings("clear")
         st.success("✅ Top 100 data cleared.")
+
+
+def rank_history_panel():
+    snapshots = rank_history.snapshots()
+    if snapshots.empty:
+        return
+    with st.expander(f"🕑 Ranking history ({len(snapshots)} snapshots)"):
+        st.dataframe(snapshots.iloc[::-1], hide_index=True, use_container_width=True)
+        if len(snapshots) < 2:
+            return
+        versions = snapshots["version"].tolist()
+        col1, col2 = st.columns(2)
+        old = col1.selectbox("Compare snapshot", versions, index=len(versions) - 2, key="rank_diff_old")
+        new = col2.selectbox("with snapshot", versions, index=len(versions) - 1, key="rank_diff_new")
+        diff = rank_history.diff(old, new)
+        moved = diff[diff["Change"] != ""]
+        st.caption(f"{len(moved)} of {len(diff)} movies changed between #{old} and #{new}")
+        st.dataframe(moved, hide_index=True, use_container_width=True)